@@ -5,13 +5,26 @@ import random
 import math
 import json
 import os
+import sys
+import argparse
+import tracemalloc
+import cProfile
+import pstats
+import threading
+import queue
+import collections
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from enum import Enum
 import mediapipe as mp
 import time
 
 
+# A small mixer buffer keeps cue latency to a few milliseconds; AudioEngine
+# retries the mixer on its own and runs silent if there is no audio device
+pygame.mixer.pre_init(44100, -16, 2, 256)
 pygame.init()
-pygame.mixer.init()
 
 
 mp_hands = mp.solutions.hands
@@ -27,7 +40,20 @@ class GameState(Enum):
     PAUSE = 7
     GAME_OVER = 8
 
+# Logical playfield coordinates; rendering maps them to whatever the window is
+PLAYFIELD_WIDTH = 800
+PLAYFIELD_HEIGHT = 600
+ROAD_LEFT = 100
+ROAD_WIDTH = 600
+
+# Car headings are bucketed so rotated sprites and masks can be built once
+ANGLE_STEP = 3
+ANGLE_STEPS = 360 // ANGLE_STEP
+
 class Car:
+    # (color, angle index) -> rotated sprite, shared by every car
+    sprite_cache = {}
+    
     def __init__(self, x, y, color=(255, 0, 0)):
         self.x = x
         self.y = y
@@ -42,8 +68,18 @@ class Car:
         self.angle = 0
         self.boost_timer = 0
         self.shield_timer = 0
+        # Per-player run stats (two-player mode keeps one set per car)
+        self.distance = 0
+        self.coins = 0
+        self.crashed = False
+        self.last_action = "coast"
+        self.steering = 0
+        self.skin = None   # asset path of an image skin, None = drawn car
+        self.image = None  # the skin's surface once the asset manager has it
         
     def update(self, action, steering_angle):
+        self.last_action = action
+        self.steering = steering_angle
     
         if action == "accelerate":
             self.speed = min(self.speed + self.acceleration, self.max_speed)
@@ -57,7 +93,8 @@ class Car:
         if self.speed > 0:
          
             steering_factor = min(self.speed / self.max_speed, 1.0)
-            self.angle += (steering_angle * 0.3 * steering_factor)
+            # turn_speed 5 (the default) keeps the original 0.3 steering gain
+            self.angle += (steering_angle * 0.3 * (self.turn_speed / 5) * steering_factor)
             
     
         self.speed *= self.friction
@@ -68,8 +105,8 @@ class Car:
         self.y += math.sin(rad) * self.speed
         
       
-        self.x = max(self.width//2, min(800 - self.width//2, self.x))
-        self.y = max(self.height//2, min(600 - self.height//2, self.y))
+        self.x = max(self.width//2, min(PLAYFIELD_WIDTH - self.width//2, self.x))
+        self.y = max(self.height//2, min(PLAYFIELD_HEIGHT - self.height//2, self.y))
         
        
         if self.boost_timer > 0:
@@ -77,28 +114,47 @@ class Car:
         if self.shield_timer > 0:
             self.shield_timer -= 1
     
-    def draw(self, screen):
-       
-        car_surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
-        
+    def angle_index(self):
+        # Quantized heading, shared by the sprite cache and the collision masks
+        return int(round(self.angle / ANGLE_STEP)) % ANGLE_STEPS
+    
+    def draw(self, screen, scale=1.0):
        
-        if self.shield_timer > 0:
+        if self.crashed:
+            color = (90, 90, 90)  # Gray once out of the race
+        elif self.shield_timer > 0:
             color = (0, 255, 255)  # Cyan for shield
         elif self.boost_timer > 0:
             color = (255, 255, 0)  # Yellow for boost
         else:
             color = self.color
-            
-        pygame.draw.rect(car_surface, color, (0, 0, self.width, self.height))
-        pygame.draw.rect(car_surface, (100, 100, 100), (0, 0, self.width, self.height), 2)
-        
-       
-        pygame.draw.rect(car_surface, (200, 200, 200), (5, 5, 10, 10))
-        pygame.draw.rect(car_surface, (200, 200, 200), (25, 5, 10, 10))
         
+        skin = self.skin if self.image is not None else None
+        key = (color, skin, self.angle_index(), scale)
+        rotated_car = Car.sprite_cache.get(key)
+        if rotated_car is None:
+            if skin is not None:
+                car_surface = self.image
+                if color != self.color:
+                    # Shield/boost/crashed tint over the skin
+                    car_surface = self.image.copy()
+                    car_surface.fill(color, special_flags=pygame.BLEND_RGB_MULT)
+            else:
+                car_surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+                pygame.draw.rect(car_surface, color, (0, 0, self.width, self.height))
+                pygame.draw.rect(car_surface, (100, 100, 100), (0, 0, self.width, self.height), 2)
+                
+               
+                pygame.draw.rect(car_surface, (200, 200, 200), (5, 5, 10, 10))
+                pygame.draw.rect(car_surface, (200, 200, 200), (25, 5, 10, 10))
+            
+            if scale == 1.0:
+                rotated_car = pygame.transform.rotate(car_surface, -key[2] * ANGLE_STEP)
+            else:
+                rotated_car = pygame.transform.rotozoom(car_surface, -key[2] * ANGLE_STEP, scale)
+            Car.sprite_cache[key] = rotated_car
        
-        rotated_car = pygame.transform.rotate(car_surface, -self.angle)
-        rect = rotated_car.get_rect(center=(self.x, self.y))
+        rect = rotated_car.get_rect(center=(self.x * scale, self.y * scale))
         screen.blit(rotated_car, rect)
 
 class Obstacle:
@@ -110,21 +166,44 @@ class Obstacle:
         self.height = 30
         self.active = True
         
-    def draw(self, screen):
+    # (type, scale) -> (sprite, offset of its top-left corner from (x, y))
+    sprites = {}
+    
+    @staticmethod
+    def sprite(obstacle_type, scale=1.0):
+        key = (obstacle_type, scale)
+        if key in Obstacle.sprites:
+            return Obstacle.sprites[key]
+        if scale != 1.0:
+            surface, (dx, dy) = Obstacle.sprite(obstacle_type)
+            width, height = surface.get_size()
+            scaled = pygame.transform.smoothscale(surface, (max(1, round(width * scale)), max(1, round(height * scale))))
+            Obstacle.sprites[key] = (scaled, (dx * scale, dy * scale))
+        else:
+            if obstacle_type == "cone":
+                surface = pygame.Surface((31, 31), pygame.SRCALPHA)
+                color = (255, 165, 0)  # Orange
+                pygame.draw.polygon(surface, color, [(15, 0), (0, 30), (30, 30)])
+                offset = (-15, 0)
+            elif obstacle_type == "pothole":
+                surface = pygame.Surface((30, 30), pygame.SRCALPHA)
+                color = (50, 50, 50)  # Dark gray
+                pygame.draw.ellipse(surface, color, (0, 0, 30, 30))
+                offset = (-15, -15)
+            else:  # roadblock
+                surface = pygame.Surface((40, 20), pygame.SRCALPHA)
+                color = (139, 69, 19)  # Brown
+                pygame.draw.rect(surface, color, (0, 0, 40, 20))
+                offset = (-20, -10)
+            Obstacle.sprites[key] = (surface, offset)
+        return Obstacle.sprites[key]
+        
+    def draw(self, screen, scale=1.0):
         if not self.active:
             return
-            
-        if self.type == "cone":
-            color = (255, 165, 0)  # Orange
-            pygame.draw.polygon(screen, color, [(self.x, self.y), 
-                                               (self.x-15, self.y+30), 
-                                               (self.x+15, self.y+30)])
-        elif self.type == "pothole":
-            color = (50, 50, 50)  # Dark gray
-            pygame.draw.ellipse(screen, color, (self.x-15, self.y-15, 30, 30))
-        elif self.type == "roadblock":
-            color = (139, 69, 19)  # Brown
-            pygame.draw.rect(screen, color, (self.x-20, self.y-10, 40, 20))
+        
+        surface, (dx, dy) = Obstacle.sprite(self.type, scale)
+        screen.blit(surface, (self.x * scale + dx, self.y * scale + dy))
 
 class Collectible:
     def __init__(self, x, y, collectible_type="coin"):
@@ -137,178 +216,1841 @@ class Collectible:
     def update(self):
         self.animation_timer += 1
         
-    def draw(self, screen):
+    def draw(self, screen, animate=True, scale=1.0):
         if not self.active:
             return
             
-        offset = math.sin(self.animation_timer * 0.1) * 3
+        offset = math.sin(self.animation_timer * 0.1) * 3 if animate else 0
+        x = self.x * scale
+        y = (self.y + offset) * scale
         
         if self.type == "coin":
             color = (255, 215, 0)  # Gold
-            pygame.draw.circle(screen, color, (int(self.x), int(self.y + offset)), 10)
-            pygame.draw.circle(screen, (255, 255, 255), (int(self.x), int(self.y + offset)), 10, 2)
+            pygame.draw.circle(screen, color, (int(x), int(y)), round(10 * scale))
+            pygame.draw.circle(screen, (255, 255, 255), (int(x), int(y)), round(10 * scale), max(1, round(2 * scale)))
         elif self.type == "boost":
             color = (255, 0, 255)  # Magenta
-            pygame.draw.polygon(screen, color, [(self.x, self.y + offset - 10),
-                                               (self.x - 8, self.y + offset + 10),
-                                               (self.x + 8, self.y + offset + 10)])
+            pygame.draw.polygon(screen, color, [(x, y - 10 * scale),
+                                               (x - 8 * scale, y + 10 * scale),
+                                               (x + 8 * scale, y + 10 * scale)])
         elif self.type == "shield":
             color = (0, 255, 255)  # Cyan
-            pygame.draw.circle(screen, color, (int(self.x), int(self.y + offset)), 12, 3)
+            pygame.draw.circle(screen, color, (int(x), int(y)), round(12 * scale), max(1, round(3 * scale)))
 
-class GestureDetector:
-    def __init__(self, sensitivity=1.0):
-        self.hands = mp_hands.Hands(
-            static_image_mode=False,
-            max_num_hands=1,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
-        )
+class ParticleSystem:
+    """
+    Fixed-capacity particles kept packed at the front of preallocated NumPy
+    arrays: emit, integrate and expire are batched array operations, and draw()
+    is a single Surface.blits() of sprites pre-rendered per colour and fade step.
+    Positions are in playfield coordinates.
+    """
+    # (colour, radius) of each sprite family
+    COLOURS = [
+        ((255, 0, 255), 3), ((255, 200, 0), 2),      # boost trail
+        ((0, 255, 255), 2), ((200, 255, 255), 2),    # shield
+        ((255, 215, 0), 2), ((255, 255, 200), 1),    # coin
+        ((90, 90, 90), 3), ((255, 140, 0), 2), ((255, 255, 255), 1),  # crash
+    ]
+    # kind -> (colour indices, speed range, life range in ticks, drag, gravity)
+    KINDS = {
+        "boost": ([0, 1], (0.5, 1.5), (12, 24), 0.92, 0.0),
+        "shield": ([2, 3], (2.0, 4.0), (20, 35), 0.9, 0.0),
+        "coin": ([4, 5], (1.0, 3.5), (15, 25), 0.93, 0.15),
+        "crash": ([6, 7, 8], (2.0, 6.0), (30, 60), 0.95, 0.1),
+    }
+    FADE_STEPS = 4
+    
+    def __init__(self, capacity=4096, seed=None):
+        self.capacity = capacity
+        self.count = 0
+        self.density = 1.0  # emission multiplier, set from the quality level
+        self.rng = np.random.default_rng(seed)
+        self.pos = np.zeros((capacity, 2), dtype=np.float32)
+        self.vel = np.zeros((capacity, 2), dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.float32)
+        self.max_life = np.ones(capacity, dtype=np.float32)
+        self.drag = np.ones(capacity, dtype=np.float32)
+        self.gravity = np.zeros(capacity, dtype=np.float32)
+        self.colour = np.zeros(capacity, dtype=np.intp)
+        self.arrays = [self.pos, self.vel, self.life, self.max_life, self.drag, self.gravity, self.colour]
+        self.sprites = {}  # scale -> [(sprite, half size)] indexed by colour * FADE_STEPS + fade
+    
+    def clear(self):
+        self.count = 0
+    
+    def emit(self, kind, x, y, n, direction=None, spread=math.pi):
+        """Emit n particles of a kind at (x, y); direction in radians, None = all around."""
+        n = min(int(round(n * self.density)), self.capacity - self.count)
+        if n <= 0:
+            return
+        colours, (speed_min, speed_max), (life_min, life_max), drag, gravity = self.KINDS[kind]
+        rng = self.rng
+        start, end = self.count, self.count + n
+        
+        if direction is None:
+            angle = rng.uniform(-math.pi, math.pi, n)
+        else:
+            angle = direction + rng.uniform(-spread, spread, n)
+        speed = rng.uniform(speed_min, speed_max, n)
+        self.pos[start:end] = (x, y)
+        self.vel[start:end, 0] = np.cos(angle) * speed
+        self.vel[start:end, 1] = np.sin(angle) * speed
+        self.life[start:end] = self.max_life[start:end] = rng.uniform(life_min, life_max, n)
+        self.drag[start:end] = drag
+        self.gravity[start:end] = gravity
+        self.colour[start:end] = rng.choice(colours, n)
+        self.count = end
+    
+    def update(self, scroll=0.0):
+        """Advance one tick; scroll moves particles with the road."""
+        n = self.count
+        if not n:
+            return
+        vel = self.vel[:n]
+        vel *= self.drag[:n, None]
+        vel[:, 1] += self.gravity[:n]
+        pos = self.pos[:n]
+        pos += vel
+        pos[:, 1] += scroll
+        life = self.life[:n]
+        life -= 1
+        
+        alive = (life > 0) & (pos[:, 1] < PLAYFIELD_HEIGHT + 10)
+        if not alive.all():
+            # Keep the survivors packed at the front
+            kept = int(alive.sum())
+            for array in self.arrays:
+                array[:kept] = array[:n][alive]
+            self.count = kept
+    
+    def sprite_table(self, scale):
+        table = self.sprites.get(scale)
+        if table is None:
+            table = []
+            for colour, radius in self.COLOURS:
+                size = max(1, round(radius * scale))
+                for fade in range(self.FADE_STEPS):
+                    sprite = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
+                    alpha = 255 * (fade + 1) // self.FADE_STEPS
+                    pygame.draw.circle(sprite, (*colour, alpha), (size, size), size)
+                    table.append(sprite)
+            self.sprites[scale] = table
+        return table
+    
+    def draw(self, surface, scale=1.0):
+        n = self.count
+        if not n:
+            return
+        table = self.sprite_table(scale)
+        fade = np.minimum((self.life[:n] / self.max_life[:n] * self.FADE_STEPS).astype(np.intp), self.FADE_STEPS - 1)
+        index = (self.colour[:n] * self.FADE_STEPS + fade).tolist()
+        # Sprites are centred on the particle: shift by half the sprite's size
+        half = np.array([table[i * self.FADE_STEPS].get_width() // 2 for i in range(len(self.COLOURS))])
+        offset = half[self.colour[:n]]
+        xy = (self.pos[:n] * scale).astype(np.intp)
+        xy -= offset[:, None]
+        # Feed blits lazily from flat int lists: materialising thousands of
+        # (sprite, pos) containers per frame sets off full GC passes
+        dest = zip(xy[:, 0].tolist(), xy[:, 1].tolist())
+        surface.blits(zip(map(table.__getitem__, index), dest), doreturn=False)
+
+def benchmark_particles(counts=(1000, 2000, 4000, 8000), frames=300, budget_ms=1000 / 60):
+    """Time update() + draw() with `count` live particles on a playfield-sized surface."""
+    surface = pygame.Surface((PLAYFIELD_WIDTH, PLAYFIELD_HEIGHT)).convert()
+    kinds = list(ParticleSystem.KINDS)
+    print(f"{'particles':>10} {'update ms':>10} {'draw ms':>10} {'p95 total':>10} {'of budget':>10}")
+    for count in counts:
+        particles = ParticleSystem(capacity=count, seed=0)
+        rng = np.random.default_rng(0)
+        update_times, draw_times, totals = [], [], []
+        for frame in range(frames + 30):
+            # Top up to the target population as particles expire
+            while particles.count < count:
+                particles.emit(kinds[frame % len(kinds)], rng.uniform(100, 700), rng.uniform(100, 500),
+                               min(64, count - particles.count))
+            surface.fill((80, 80, 80))
+            start = time.perf_counter()
+            particles.update(scroll=4)
+            mid = time.perf_counter()
+            particles.draw(surface)
+            end = time.perf_counter()
+            if frame >= 30:  # after sprite tables are built
+                update_times.append((mid - start) * 1000)
+                draw_times.append((end - mid) * 1000)
+                totals.append((end - start) * 1000)
+        p95 = float(np.percentile(totals, 95))
+        print(f"{count:>10} {np.median(update_times):>10.3f} {np.median(draw_times):>10.3f} "
+              f"{p95:>10.3f} {p95 / budget_ms:>10.0%}")
+
+MAX_PLAYERS = 2
+FINGER_TIPS = [4, 8, 12, 16, 20]
+
+# Integer hand-state codes so per-player smoothing can live in NumPy rings
+HAND_FIST = 0
+HAND_NEUTRAL = 1
+HAND_OPEN = 2
+HAND_STATE_NAMES = ("fist", "neutral", "open")
+
+# One MediaPipe detection as logged by LandmarkLogger. handedness: 0 left,
+# 1 right, -1 unknown; state is the raw (unsmoothed) HAND_* code
+LANDMARK_RECORD = np.dtype([
+    ("t", "<f8"),
+    ("points", "<f4", (21, 3)),
+    ("angle", "<f4"),
+    ("frame", "<u4"),
+    ("player", "i1"),
+    ("handedness", "i1"),
+    ("state", "i1"),
+], align=True)
+
+OBSTACLE_TYPES = ["cone", "pothole", "roadblock"]
+COLLECTIBLE_TYPES = ["coin", "boost", "shield"]
+# Spawn kinds 0-2 are obstacles, 3-5 collectibles
+SPAWN_TYPES = OBSTACLE_TYPES + COLLECTIBLE_TYPES
+
+class CollisionMasks:
+    """
+    pygame masks built once: the car footprint at every quantized heading and
+    one per obstacle sprite. hit() does a bounding-box check before the mask test.
+    """
+    def __init__(self, car_size=(40, 20)):
+        footprint = pygame.Surface(car_size, pygame.SRCALPHA)
+        footprint.fill((255, 255, 255, 255))
+        
+        # angle index -> (mask, half width, half height)
+        self.car = []
+        for index in range(ANGLE_STEPS):
+            rotated = pygame.transform.rotate(footprint, -index * ANGLE_STEP)
+            self.car.append((pygame.mask.from_surface(rotated), rotated.get_width() // 2, rotated.get_height() // 2))
+        
+        # type -> (mask, offset x, offset y, width, height)
+        self.obstacles = {}
+        for obstacle_type in OBSTACLE_TYPES:
+            surface, (dx, dy) = Obstacle.sprite(obstacle_type)
+            width, height = surface.get_size()
+            self.obstacles[obstacle_type] = (pygame.mask.from_surface(surface), dx, dy, width, height)
+        
+        # Centre-to-centre distance beyond which nothing can touch; callers
+        # test this inline so far-away obstacles cost what the old check did
+        car_reach = math.hypot(*car_size) / 2
+        obstacle_reach = max(max(abs(dx), abs(dy), abs(dx + w), abs(dy + h))
+                             for _, dx, dy, w, h in self.obstacles.values())
+        self.reach = int(math.ceil(car_reach + obstacle_reach))
+    
+    def hit(self, car, obstacle):
+        car_mask, half_w, half_h = self.car[car.angle_index()]
+        car_left = int(car.x) - half_w
+        car_top = int(car.y) - half_h
+        
+        obstacle_mask, dx, dy, width, height = self.obstacles[obstacle.type]
+        left = int(obstacle.x) + dx
+        top = int(obstacle.y) + dy
+        
+        if (left >= car_left + 2 * half_w + 1 or left + width <= car_left or
+                top >= car_top + 2 * half_h + 1 or top + height <= car_top):
+            return False
+        return car_mask.overlap(obstacle_mask, (left - car_left, top - car_top)) is not None
+
+class CourseGenerator:
+    """
+    Seeded spawn schedule, generated in NumPy chunks ahead of the player.
+    The tick loop only streams (tick, x, kind) entries from the current chunk.
+    """
+    LANE_STEPS = np.array([-2, -1, 1, 2])
+    
+    def __init__(self, seed=None, chunk_size=128, lanes=7):
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self.chunk_size = chunk_size
+        self.lane_x = np.linspace(ROAD_LEFT, ROAD_LEFT + ROAD_WIDTH, lanes)
+        
+        # Difficulty curve: spawn interval eases from 28 ticks down to 10,
+        # and the obstacle share rises from 65% to 80%
+        self.start_interval = 28
+        self.min_interval = 10
+        self.ramp_entries = 200
+        
+        self.generated = 0
+        self.last_tick = 0
+        self.last_lane = lanes // 2
+        self.generate_chunk()
+    
+    def generate_chunk(self):
+        n = self.chunk_size
+        rng = self.rng
+        
+        index = self.generated + np.arange(n)
+        difficulty = 1.0 - np.exp(-index / self.ramp_entries)
+        interval = self.start_interval - (self.start_interval - self.min_interval) * difficulty
+        interval = np.rint(interval * rng.uniform(0.8, 1.2, n))
+        interval = np.maximum(interval, self.min_interval).astype(np.int64)
+        ticks = self.last_tick + np.cumsum(interval)
+        
+        # Lane random walk that never repeats a lane back to back, so there is
+        # always at least two spawn intervals between objects in the same lane
+        lanes = (self.last_lane + np.cumsum(rng.choice(self.LANE_STEPS, n))) % len(self.lane_x)
+        xs = np.clip(self.lane_x[lanes] + rng.uniform(-20, 20, n), 50, PLAYFIELD_WIDTH - 50).astype(np.int64)
+        
+        is_obstacle = rng.random(n) < 0.65 + 0.15 * difficulty
+        kinds = np.where(is_obstacle, rng.integers(0, 3, n), rng.integers(3, 6, n))
+        
+        self.generated += n
+        self.last_tick = int(ticks[-1])
+        self.last_lane = int(lanes[-1])
+        
+        # Plain lists make the per-tick streaming a couple of index lookups
+        self.ticks = ticks.tolist()
+        self.xs = xs.tolist()
+        self.kinds = kinds.tolist()
+        self.cursor = 0
+        self.next_tick = self.ticks[0]
+    
+    def pop(self):
+        """Return (x, kind) of the next due entry and advance the schedule."""
+        i = self.cursor
+        entry = (self.xs[i], self.kinds[i])
+        self.cursor = i + 1
+        if self.cursor == len(self.ticks):
+            self.generate_chunk()
+        else:
+            self.next_tick = self.ticks[self.cursor]
+        return entry
+
+class SyntheticCapture:
+    """Stand-in for cv2.VideoCapture that serves a static frame (soak runs, no camera)."""
+    def __init__(self, width=640, height=480):
+        self.frame = np.full((height, width, 3), 40, dtype=np.uint8)
+        cv2.putText(self.frame, "SYNTHETIC", (20, height // 2), cv2.FONT_HERSHEY_SIMPLEX, 2, (200, 200, 200), 3)
+        
+    def isOpened(self):
+        return True
+    
+    def read(self, image=None):
+        if image is None or image.shape != self.frame.shape:
+            return True, self.frame.copy()
+        np.copyto(image, self.frame)
+        return True, image
+    
+    def release(self):
+        pass
+
+class LoopingVideoCapture:
+    """Plays a recorded video as if it were the camera, rewinding at the end."""
+    def __init__(self, path):
+        self.cap = cv2.VideoCapture(path)
+        
+    def isOpened(self):
+        return self.cap.isOpened()
+    
+    def read(self, image=None):
+        ret, frame = self.cap.read(image=image)
+        if not ret:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read(image=image)
+        return ret, frame
+    
+    def release(self):
+        self.cap.release()
+
+def open_frame_source(source=None):
+    """None/index -> camera, "synthetic" -> SyntheticCapture, else a video file path."""
+    if source is None:
+        return cv2.VideoCapture(0)
+    if source == "synthetic":
+        return SyntheticCapture()
+    if str(source).isdigit():
+        return cv2.VideoCapture(int(source))
+    return LoopingVideoCapture(source)
+
+class FramePool:
+    """
+    Fixed set of preallocated frame buffers. acquire() hands a buffer out,
+    release() gives it back; steady-state capture then allocates nothing.
+    """
+    def __init__(self, shape, count=4):
+        self.shape = shape
+        self.free = [np.empty(shape, dtype=np.uint8) for _ in range(count)]
+        self.allocated = count
+    
+    def acquire(self):
+        if self.free:
+            return self.free.pop()
+        # Someone is holding more buffers than planned; grow instead of stalling
+        self.allocated += 1
+        return np.empty(self.shape, dtype=np.uint8)
+    
+    def release(self, buffer):
+        if buffer.shape == self.shape:
+            self.free.append(buffer)
+
+class FrameCapture:
+    """
+    Reads frames from a capture source into one reused raw buffer and mirrors
+    them straight into a pooled buffer. The caller owns each frame it gets
+    from read() until it hands it back with release().
+    """
+    def __init__(self, source, pool_size=4):
+        self.source = source
+        self.pool_size = pool_size
+        self.raw = None
+        self.pool = None
+        self.wait_ms = 0.0  # time spent blocked in source.read(), reset by the caller
+    
+    def read(self):
+        start = time.perf_counter()
+        if self.raw is None:
+            ret, raw = self.source.read()
+        else:
+            ret, raw = self.source.read(image=self.raw)
+        self.wait_ms += (time.perf_counter() - start) * 1000
+        if not ret or raw is None:
+            return None
+        
+        if self.pool is None or raw.shape != self.pool.shape:
+            self.pool = FramePool(raw.shape, self.pool_size)
+        self.raw = raw
+        
+        frame = self.pool.acquire()
+        cv2.flip(raw, 1, dst=frame)  # Mirror image
+        return frame
+    
+    def release(self, frame):
+        if frame is not None and self.pool is not None:
+            self.pool.release(frame)
+    
+    def close(self):
+        self.source.release()
+
+class LandmarkLogger:
+    """
+    Appends every hand detection as a fixed-size LANDMARK_RECORD to a raw binary
+    file, which load_landmark_log() maps back as a structured array. The game loop
+    only fills an in-memory block; full blocks go over a bounded queue to a writer
+    thread that grows the file and copies them into a memory map. If the writer
+    falls behind, whole blocks are dropped and counted rather than waited on.
+    """
+    def __init__(self, path, block_size=256, blocks=4, grow_records=65536):
+        self.path = path
+        self.block_size = block_size
+        self.grow_records = grow_records
+        self.free = queue.Queue()
+        for _ in range(blocks):
+            self.free.put(np.zeros(block_size, dtype=LANDMARK_RECORD))
+        self.queue = queue.Queue(maxsize=blocks)
+        self.block = self.free.get()
+        self.count = 0
+        self.logged = 0
+        self.dropped = 0
+        self.written = 0
+        self.thread = threading.Thread(target=self.run, name="landmark-logger", daemon=True)
+        self.thread.start()
+    
+    def log(self, frame, points, players, handedness, states, angles):
+        """Append one frame's detections; points is (n, 21, 3)."""
+        n = len(players)
+        t = time.time()
+        for i in range(n):
+            if self.count == self.block_size:
+                self.hand_off()
+            record = self.block[self.count]
+            record["t"] = t
+            record["points"] = points[i]
+            record["angle"] = angles[i]
+            record["frame"] = frame
+            record["player"] = players[i]
+            record["handedness"] = handedness[i]
+            record["state"] = states[i]
+            self.count += 1
+        self.logged += n
+    
+    def hand_off(self):
+        try:
+            block = self.free.get_nowait()
+        except queue.Empty:
+            # Writer is behind and holds every spare block: this one is overwritten
+            self.dropped += self.count
+            self.count = 0
+            return
+        # Never full: each block is either free, queued, or the current one
+        self.queue.put_nowait((self.block, self.count))
+        self.block = block
+        self.count = 0
+    
+    def run(self):
+        itemsize = LANDMARK_RECORD.itemsize
+        capacity = 0
+        mapped = None
+        with open(self.path, "wb+") as f:
+            while True:
+                item = self.queue.get()
+                if item is None:
+                    break
+                block, n = item
+                if self.written + n > capacity:
+                    # Grow the file in large steps so remapping is rare
+                    if mapped is not None:
+                        mapped.flush()
+                        del mapped
+                    capacity = max(capacity * 2, self.written + n, self.grow_records)
+                    f.truncate(capacity * itemsize)
+                    mapped = np.memmap(f, dtype=LANDMARK_RECORD, mode="r+", shape=(capacity,))
+                mapped[self.written:self.written + n] = block[:n]
+                self.written += n
+                self.free.put(block)
+            
+            if mapped is not None:
+                mapped.flush()
+                del mapped
+            f.truncate(self.written * itemsize)
+    
+    def close(self):
+        if self.count:
+            self.queue.put((self.block, self.count))
+            self.count = 0
+        self.queue.put(None)
+        self.thread.join()
+        print(f"Landmark log: {self.written} records written, {self.dropped} dropped -> {self.path}")
+
+def load_landmark_log(path):
+    """Memory-map a LandmarkLogger file as a LANDMARK_RECORD array, without copying."""
+    if os.path.getsize(path) < LANDMARK_RECORD.itemsize:
+        return np.zeros(0, dtype=LANDMARK_RECORD)
+    records = np.memmap(path, dtype=LANDMARK_RECORD, mode="r")
+    # A session that did not shut down cleanly leaves unwritten (t == 0) records at the end
+    filled = np.flatnonzero(records["t"])
+    return records[:filled[-1] + 1 if len(filled) else 0]
+
+class BaseGestureDetector:
+    """
+    Per-player smoothing and action mapping shared by the gesture engines.
+    Subclasses implement detect_gesture() and feed update_players().
+    """
+    def __init__(self, sensitivity=1.0, max_num_hands=1):
+        self.num_players = max(1, min(MAX_PLAYERS, max_num_hands))
         self.finger_count = 0
         self.hand_angle = 0
         self.is_fist = False
         self.is_open_hand = False
-        self.gesture_history = []
-        self.angle_history = []
         self.smoothing_window = 8
         self.sensitivity = sensitivity
         self.hand_center = None
         
-    def count_fingers(self, landmarks):
-        # Finger tip and pip landmarks
-        finger_tips = [4, 8, 12, 16, 20]
-        finger_pips = [3, 6, 10, 14, 18]
+        # Per-player results; player 0 is mirrored into the attributes above
+        self.player_fist = [False] * MAX_PLAYERS
+        self.player_open_hand = [False] * MAX_PLAYERS
+        self.player_angle = [0.0] * MAX_PLAYERS
+        self.player_center = [None] * MAX_PLAYERS
+        self.reset_smoothing()
+        
+        # Frames that ran the engine vs. frames that reused the previous result,
+        # either because nothing moved (skipped) or the quality level capped
+        # the inference rate (throttled)
+        self.inferred_frames = 0
+        self.skipped_frames = 0
+        self.throttled_frames = 0
+        self.ran_inference = False  # whether the last detect_gesture() ran the engine
+    
+    @property
+    def skip_ratio(self):
+        # Share of would-be inferences the motion gate saved; throttled frames never were
+        total = self.inferred_frames + self.skipped_frames
+        return self.skipped_frames / total if total else 0.0
+    
+    def set_num_players(self, num_players):
+        self.num_players = max(1, min(MAX_PLAYERS, num_players))
+        self.reset_smoothing()
+    
+    def reset_smoothing(self):
+        # One ring per player; -1 marks entries that have not been filled yet
+        self.state_history = np.full((MAX_PLAYERS, self.smoothing_window), -1, dtype=np.int8)
+        self.angle_history = np.zeros((MAX_PLAYERS, self.smoothing_window), dtype=np.float32)
+        self.history_pos = np.zeros(MAX_PLAYERS, dtype=np.intp)
+        self.history_len = np.zeros(MAX_PLAYERS, dtype=np.intp)
+        self.last_centers = [None] * MAX_PLAYERS
+        for player in range(MAX_PLAYERS):
+            self.clear_player(player)
+    
+    def steering_angle(self, dx, dy):
+        # Angle of the wrist -> palm vector relative to vertical (works on arrays too)
+        angle = np.degrees(np.arctan2(dx, dy)) / 10
+        return np.clip(angle * self.sensitivity, -90, 90)
+    
+    def assign_players(self, centers, handedness=None):
+        """Map each detected hand to a player slot from its normalized (x, y) center."""
+        if self.num_players == 1:
+            return [0]
+        
+        if len(centers) == 2:
+            # Left of the mirrored frame is player 1; handedness breaks near-ties
+            if abs(centers[0][0] - centers[1][0]) < 0.05 and handedness:
+                first = 0 if handedness[0].classification[0].label == "Left" else 1
+            else:
+                first = 0 if centers[0][0] <= centers[1][0] else 1
+            return [0, 1] if first == 0 else [1, 0]
+        
+        # A single hand goes to whichever player was last seen nearest to it
+        known = [(p, c) for p, c in enumerate(self.last_centers[:self.num_players]) if c is not None]
+        x, y = centers[0][0], centers[0][1]
+        if known:
+            return [min(known, key=lambda pc: (pc[1][0] - x) ** 2 + (pc[1][1] - y) ** 2)[0]]
+        return [0 if x < 0.5 else 1]
+    
+    def clear_player(self, player):
+        self.player_fist[player] = False
+        self.player_open_hand[player] = False
+        self.player_angle[player] = 0
+        self.player_center[player] = None
+    
+    def update_players(self, players, states, angles, centers, norm_centers):
+        """Push one frame of per-hand results through each player's smoothing ring."""
+        seen = [False] * MAX_PLAYERS
+        if players:
+            slots = np.array(players, dtype=np.intp)
+            pos = self.history_pos[slots]
+            self.state_history[slots, pos] = states
+            self.angle_history[slots, pos] = angles
+            self.history_pos[slots] = (pos + 1) % self.smoothing_window
+            self.history_len[slots] = np.minimum(self.history_len[slots] + 1, self.smoothing_window)
+            
+            history = self.state_history[slots]
+            majority = self.smoothing_window // 2
+            fist = (history == HAND_FIST).sum(axis=1) > majority
+            open_hand = (history == HAND_OPEN).sum(axis=1) > majority
+            smoothed = self.angle_history[slots].sum(axis=1) / self.history_len[slots]
+            
+            for i, player in enumerate(players):
+                seen[player] = True
+                self.player_fist[player] = bool(fist[i])
+                self.player_open_hand[player] = bool(open_hand[i])
+                self.player_angle[player] = float(smoothed[i])
+                self.player_center[player] = centers[i]
+                self.last_centers[player] = (float(norm_centers[i][0]), float(norm_centers[i][1]))
+        
+        # No hand detected for these players
+        for player in range(MAX_PLAYERS):
+            if not seen[player]:
+                self.clear_player(player)
+        
+        self.is_fist = self.player_fist[0]
+        self.is_open_hand = self.player_open_hand[0]
+        self.hand_angle = self.player_angle[0]
+        self.hand_center = self.player_center[0]
+    
+    def smooth_states(self, states, angles):
+        """
+        Offline version of the update_players() smoothing for one player's whole
+        sequence of raw states/angles. Returns (smoothed state codes, smoothed angles).
+        """
+        window = self.smoothing_window
+        n = len(states)
+        filled = np.arange(1, n + 1)
         
-        fingers = []
+        def trailing_sum(values):
+            # Sum over the last `window` entries at every step
+            total = np.concatenate([[0], np.cumsum(values, dtype=np.float64)])
+            return total[filled] - total[np.maximum(filled - window, 0)]
         
-        # Thumb (different logic due to orientation)
-        if landmarks[finger_tips[0]].x > landmarks[finger_pips[0]].x:
-            fingers.append(1)
+        majority = window // 2
+        fist = trailing_sum(states == HAND_FIST) > majority
+        open_hand = trailing_sum(states == HAND_OPEN) > majority
+        smoothed = np.where(fist, HAND_FIST, np.where(open_hand, HAND_OPEN, HAND_NEUTRAL)).astype(np.int8)
+        return smoothed, (trailing_sum(angles) / np.minimum(filled, window)).astype(np.float32)
+    
+    def draw_angle_indicator(self, frame, player):
+        center = self.player_center[player]
+        cv2.circle(frame, center, 10, (0, 255, 0), -1)
+        angle_rad = math.radians(self.player_angle[player])
+        end_x = int(center[0] + 50 * math.sin(angle_rad))
+        end_y = int(center[1] - 50 * math.cos(angle_rad))
+        cv2.line(frame, center, (end_x, end_y), (255, 0, 0), 3)
+    
+    def get_action_and_steering(self, player=0):
+        if self.player_fist[player]:
+            return "brake", self.player_angle[player]
+        elif self.player_open_hand[player]:
+            return "accelerate", self.player_angle[player]
         else:
-            fingers.append(0)
+            return "coast", self.player_angle[player]
+
+class GestureDetector(BaseGestureDetector):
+    def __init__(self, sensitivity=1.0, max_num_hands=1):
+        super().__init__(sensitivity, max_num_hands)
+        self.hands = self.create_hands(self.num_players)
+        self.fist_threshold = 0.15
+        self.open_threshold = 0.25
+        
+        # Every tracked hand is copied into one preallocated batch per frame
+        self.points = np.zeros((MAX_PLAYERS, 21, 3), dtype=np.float32)
+        self.last_hand_list = []
+        self.last_players = []
+        self.rgb_frame = None
+        self.logger = None  # optional LandmarkLogger
+        
+        # Quality knobs, set by QualityGovernor
+        self.inference_scale = 1.0
+        self.inference_interval = 1
+        self.draw_landmarks = True
+        self.scaled_frame = None
+        
+        # Motion gate: skip inference while a downscaled grayscale view of the
+        # hand region barely changes, but never for more than max_skip_frames
+        self.motion_gate = True
+        self.motion_size = (64, 48)
+        self.motion_threshold = 3.0  # mean absolute difference, 0-255 scale
+        self.max_skip_frames = 5
+        width, height = self.motion_size
+        self.motion_small = np.empty((height, width, 3), dtype=np.uint8)
+        self.motion_gray = np.empty((height, width), dtype=np.uint8)
+        self.motion_reference = np.empty((height, width), dtype=np.uint8)
+        self.motion_diff = np.empty((height, width), dtype=np.uint8)
+        self.has_reference = False
+        self.frames_since_inference = 0
+    
+    def create_hands(self, max_num_hands):
+        return mp_hands.Hands(
+            static_image_mode=False,
+            max_num_hands=max_num_hands,
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5
+        )
+    
+    def set_num_players(self, num_players):
+        num_players = max(1, min(MAX_PLAYERS, num_players))
+        if num_players != self.num_players:
+            # Hands() fixes max_num_hands at construction, and a 2-hand model
+            # keeps searching for the second palm, so only pay for it in 2P
+            self.hands.close()
+            self.hands = self.create_hands(num_players)
+        super().set_num_players(num_players)
+        self.last_hand_list = []
+        self.last_players = []
+        self.has_reference = False
+    
+    def motion_roi(self):
+        """Hand bounding box in motion-grid coordinates, or None for the whole frame."""
+        # With a player's hand missing, a new hand could appear anywhere
+        if len(self.last_players) < self.num_players:
+            return None
+        width, height = self.motion_size
+        tracked = self.points[:len(self.last_players), :, :2]
+        x0, y0 = tracked.min(axis=(0, 1))
+        x1, y1 = tracked.max(axis=(0, 1))
+        margin = 0.1
+        return (max(0, int((x0 - margin) * width)), max(0, int((y0 - margin) * height)),
+                min(width, int((x1 + margin) * width) + 1), min(height, int((y1 + margin) * height) + 1))
+    
+    def frame_is_static(self, frame):
+        cv2.resize(frame, self.motion_size, dst=self.motion_small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self.motion_small, cv2.COLOR_BGR2GRAY, dst=self.motion_gray)
+        if not self.has_reference or self.frames_since_inference >= self.max_skip_frames:
+            return False
+        
+        cv2.absdiff(self.motion_gray, self.motion_reference, dst=self.motion_diff)
+        roi = self.motion_roi()
+        if roi is not None:
+            x0, y0, x1, y1 = roi
+            diff = self.motion_diff[y0:y1, x0:x1]
+            if diff.size == 0:
+                return False
+        else:
+            diff = self.motion_diff
+        return cv2.mean(diff)[0] < self.motion_threshold
+    
+    def draw_overlay(self, frame):
+        for i, player in enumerate(self.last_players):
+            # Draw hand landmarks
+            if self.draw_landmarks:
+                mp_drawing.draw_landmarks(frame, self.last_hand_list[i], mp_hands.HAND_CONNECTIONS)
             
-        # Other fingers
-        for i in range(1, 5):
-            if landmarks[finger_tips[i]].y < landmarks[finger_pips[i]].y:
-                fingers.append(1)
-            else:
-                fingers.append(0)
-                
-        return sum(fingers)
+            # Draw angle indicator
+            self.draw_angle_indicator(frame, player)
+        
+    def classify_points(self, points):
+        """
+        Classify hands from their landmarks: the mean fingertip-to-palm distance
+        against fist_threshold/open_threshold gives the state, the wrist -> palm
+        vector the steering angle.
+        points: (n, 21, 3) normalized landmarks. Returns (state codes, angles).
+        """
+        palm = points[:, 9, :2]
+        tips = points[:, FINGER_TIPS, :2]
+        avg_distance = np.sqrt(((tips - palm[:, None, :]) ** 2).sum(axis=2)).mean(axis=1)
+        states = np.where(avg_distance < self.fist_threshold, HAND_FIST,
+                          np.where(avg_distance > self.open_threshold, HAND_OPEN, HAND_NEUTRAL))
+        
+        d = palm - points[:, 0, :2]
+        return states, self.steering_angle(d[:, 0], d[:, 1])
     
-    def calculate_hand_angle(self, landmarks):
+    def detect_gesture(self, frame):
+        reuse = True
+        if self.frames_since_inference + 1 < self.inference_interval:
+            # Inference rate capped by the quality level
+            self.throttled_frames += 1
+        elif self.motion_gate and self.frame_is_static(frame):
+            # Hand held steady
+            self.skipped_frames += 1
+        else:
+            reuse = False
         
-        wrist = landmarks[0]
-        middle_mcp = landmarks[9]
+        if reuse:
+            # Keep the previous result
+            self.frames_since_inference += 1
+            self.ran_inference = False
+            self.draw_overlay(frame)
+            return self.is_fist, self.is_open_hand, self.hand_angle
         
-        # Calculate angle of hand relative to vertical
-        dx = middle_mcp.x - wrist.x
-        dy = middle_mcp.y - wrist.y
+        self.inferred_frames += 1
+        self.ran_inference = True
+        self.frames_since_inference = 0
+        if self.motion_gate:
+            np.copyto(self.motion_reference, self.motion_gray)
+            self.has_reference = True
         
-        angle = math.degrees(math.atan2(dx, dy))/10#priyanshu
+        source = frame
+        if self.inference_scale < 1.0:
+            # Landmarks are normalized, so a smaller input needs no remapping
+            height, width = frame.shape[:2]
+            size = (int(width * self.inference_scale), int(height * self.inference_scale))
+            if self.scaled_frame is None or self.scaled_frame.shape[:2] != (size[1], size[0]):
+                self.scaled_frame = np.empty((size[1], size[0], 3), dtype=np.uint8)
+            cv2.resize(frame, size, dst=self.scaled_frame, interpolation=cv2.INTER_AREA)
+            source = self.scaled_frame
+        if self.rgb_frame is None or self.rgb_frame.shape != source.shape:
+            self.rgb_frame = np.empty_like(source)
+        cv2.cvtColor(source, cv2.COLOR_BGR2RGB, dst=self.rgb_frame)
+        results = self.hands.process(self.rgb_frame)
         
+        hand_list = results.multi_hand_landmarks or []
+        n = min(len(hand_list), self.num_players)
+        players, states, angles, centers, norm_centers = [], None, None, [], None
+        
+        if n:
+            points = self.points
+            for i in range(n):
+                for j, lm in enumerate(hand_list[i].landmark):
+                    points[i, j, 0] = lm.x
+                    points[i, j, 1] = lm.y
+                    points[i, j, 2] = lm.z
+            
+            norm_centers = points[:n, 9, :2]
+            players = self.assign_players(norm_centers, results.multi_handedness)
+            states, angles = self.classify_points(points[:n])
+            height, width = frame.shape[:2]
+            centers = [(int(x * width), int(y * height)) for x, y in norm_centers]
+            
+            if self.logger is not None:
+                handedness = [{"Left": 0, "Right": 1}.get(h.classification[0].label, -1)
+                              for h in (results.multi_handedness or [])[:n]]
+                handedness += [-1] * (n - len(handedness))
+                self.logger.log(self.inferred_frames, points, players, handedness, states, angles)
         
-        angle = max(-90, min(90, angle * self.sensitivity)) #priyanshu 
+        self.update_players(players, states, angles, centers, norm_centers)
+        self.last_hand_list = hand_list
+        self.last_players = players
+        self.draw_overlay(frame)
+            
+        return self.is_fist, self.is_open_hand, self.hand_angle
+
+class ContourGestureDetector(BaseGestureDetector):
+    """
+    OpenCV-only fallback for machines where MediaPipe can't keep up.
+    Skin segmentation (optionally gated by a background model) on a downscaled
+    frame, then convexity defects for fist/open and image moments for steering.
+    """
+    def __init__(self, sensitivity=1.0, max_num_hands=1, work_size=(320, 240), use_background=False):
+        super().__init__(sensitivity, max_num_hands)
+        self.work_size = work_size
+        width, height = work_size
+        self.small = np.empty((height, width, 3), dtype=np.uint8)
+        self.ycrcb = np.empty((height, width, 3), dtype=np.uint8)
+        self.mask = np.empty((height, width), dtype=np.uint8)
+        self.kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
         
-        return angle
+        # YCrCb skin range, fairly robust across skin tones under indoor light
+        self.skin_lower = np.array([0, 133, 77], dtype=np.uint8)
+        self.skin_upper = np.array([255, 173, 127], dtype=np.uint8)
+        self.min_area = 0.02 * width * height
+        self.background = cv2.createBackgroundSubtractorMOG2(history=300, detectShadows=False) if use_background else None
+        
+        # Fist/open decision thresholds
+        self.open_min_fingers = 3
+        self.fist_min_solidity = 0.85
     
-  
-    def detect_hand_state(self, landmarks):
-        palm_center = landmarks[9] 
-        finger_tips = [4, 8, 12, 16, 20]
-
-        distances = []
-        for tip_idx in finger_tips:
-            tip = landmarks[tip_idx]
-            distance = math.sqrt((tip.x - palm_center.x)**2 + (tip.y - palm_center.y)**2)
-            distances.append(distance)
-
-        avg_distance = sum(distances) / len(distances)
-
-        if avg_distance < 0.15:
-            return "fist"
-        elif avg_distance > 0.25:
-            return "open"
+    def count_defects(self, contour, area):
+        hull = cv2.convexHull(contour, returnPoints=False)
+        if len(hull) <= 3:
+            return 0
+        try:
+            defects = cv2.convexityDefects(contour, hull)
+        except cv2.error:
+            # Self-intersecting contours make convexityDefects throw
+            return 0
+        if defects is None:
+            return 0
+        
+        defects = defects.reshape(-1, 4)
+        start = contour[defects[:, 0], 0].astype(np.float32)
+        end = contour[defects[:, 1], 0].astype(np.float32)
+        far = contour[defects[:, 2], 0].astype(np.float32)
+        depth = defects[:, 3] / 256.0
+        
+        # A finger gap is a deep defect with an acute angle at its far point
+        a = np.linalg.norm(end - start, axis=1)
+        b = np.linalg.norm(far - start, axis=1)
+        c = np.linalg.norm(end - far, axis=1)
+        cos_angle = (b ** 2 + c ** 2 - a ** 2) / np.maximum(2 * b * c, 1e-6)
+        gaps = (cos_angle > 0) & (depth > 0.15 * math.sqrt(area))
+        return int(gaps.sum())
+    
+    def classify_contour(self, contour, area):
+        hull_area = cv2.contourArea(cv2.convexHull(contour))
+        solidity = area / hull_area if hull_area > 0 else 1.0
+        gaps = self.count_defects(contour, area)
+        
+        if gaps >= self.open_min_fingers - 1:
+            return HAND_OPEN
+        elif gaps == 0 and solidity >= self.fist_min_solidity:
+            return HAND_FIST
         else:
-            return "neutral"
+            return HAND_NEUTRAL
+    
+    def contour_direction(self, moments):
+        # Principal axis from central moments, oriented to point up the frame
+        theta = 0.5 * math.atan2(2 * moments["mu11"], moments["mu20"] - moments["mu02"])
+        dx, dy = math.cos(theta), math.sin(theta)
+        if dy > 0:
+            dx, dy = -dx, -dy
+        return dx, dy
+    
+    def detect_gesture(self, frame):
+        self.inferred_frames += 1
+        self.ran_inference = True
+        cv2.resize(frame, self.work_size, dst=self.small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self.small, cv2.COLOR_BGR2YCrCb, dst=self.ycrcb)
+        cv2.inRange(self.ycrcb, self.skin_lower, self.skin_upper, dst=self.mask)
+        if self.background is not None:
+            foreground = self.background.apply(self.small)
+            cv2.bitwise_and(self.mask, foreground, dst=self.mask)
+        cv2.morphologyEx(self.mask, cv2.MORPH_OPEN, self.kernel, dst=self.mask)
+        cv2.morphologyEx(self.mask, cv2.MORPH_CLOSE, self.kernel, dst=self.mask)
+        
+        contours, _ = cv2.findContours(self.mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        candidates = sorted(((cv2.contourArea(c), c) for c in contours), key=lambda ac: ac[0], reverse=True)
+        candidates = [(a, c) for a, c in candidates[:self.num_players] if a >= self.min_area]
+        
+        width, height = self.work_size
+        scale_x = frame.shape[1] / width
+        scale_y = frame.shape[0] / height
+        players, states, angles, centers, norm_centers = [], [], [], [], []
+        for area, contour in candidates:
+            moments = cv2.moments(contour)
+            cx, cy = moments["m10"] / moments["m00"], moments["m01"] / moments["m00"]
+            states.append(self.classify_contour(contour, area))
+            angles.append(float(self.steering_angle(*self.contour_direction(moments))))
+            norm_centers.append((cx / width, cy / height))
+            centers.append((int(cx * scale_x), int(cy * scale_y)))
+        
+        if candidates:
+            players = self.assign_players(norm_centers)
+        self.update_players(players, np.array(states), np.array(angles), centers, norm_centers)
+        
+        for i, player in enumerate(players):
+            outline = (candidates[i][1] * (scale_x, scale_y)).astype(np.int32)
+            cv2.drawContours(frame, [outline], -1, (0, 200, 255), 2)
+            self.draw_angle_indicator(frame, player)
+        
+        return self.is_fist, self.is_open_hand, self.hand_angle
 
+class GestureEngineSwitcher:
+    """
+    Presents one gesture engine to the game and, in "auto" mode, drops from
+    MediaPipe to the contour tracker when inference overruns its budget,
+    probing MediaPipe periodically to switch back once there is headroom.
+    """
+    def __init__(self, primary, fallback, mode="auto", budget_ms=12.0,
+                 patience=30, probe_interval=600, probe_frames=15):
+        self.primary = primary
+        self.fallback = fallback
+        self.mode = mode if primary is not None else "contour"
+        self.active = fallback if self.mode == "contour" else primary
+        self.budget_ms = budget_ms
+        self.patience = patience
+        self.probe_interval = probe_interval
+        self.probe_frames = probe_frames
+        
+        self.inference_ms = 0.0
+        self.over_budget = 0
+        self.frames_on_fallback = 0
+        self.probe_samples = None
+    
+    def __getattr__(self, name):
+        # Everything else (is_fist, hand_center, player_* ...) reads from the active engine
+        return getattr(self.active, name)
+    
+    @property
+    def engine_name(self):
+        return "mediapipe" if self.active is self.primary else "contour"
+    
+    @property
+    def sensitivity(self):
+        return self.active.sensitivity
+    
+    @sensitivity.setter
+    def sensitivity(self, value):
+        for engine in (self.primary, self.fallback):
+            if engine is not None:
+                engine.sensitivity = value
+    
+    def set_num_players(self, num_players):
+        for engine in (self.primary, self.fallback):
+            if engine is not None:
+                engine.set_num_players(num_players)
+    
+    def switch_to(self, engine, reason):
+        self.active = engine
+        self.over_budget = 0
+        self.frames_on_fallback = 0
+        print(f"Gesture engine -> {self.engine_name} ({reason})")
     
     def detect_gesture(self, frame):
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.hands.process(rgb_frame)
+        engine = self.active
+        start = time.perf_counter()
+        result = engine.detect_gesture(frame)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if not engine.ran_inference:
+            # A reused result says nothing about what inference costs
+            return result
+        self.inference_ms = 0.9 * self.inference_ms + 0.1 * elapsed_ms if self.inference_ms else elapsed_ms
         
-        if results.multi_hand_landmarks:
-            for hand_landmarks in results.multi_hand_landmarks:
-                landmarks = hand_landmarks.landmark
-                
-               
-                finger_count = self.count_fingers(landmarks)
-                
-               
-                hand_state = self.detect_hand_state(landmarks)
-                
-               
-                angle = self.calculate_hand_angle(landmarks)
-                
-             
-                self.gesture_history.append(hand_state)
-                self.angle_history.append(angle)
-                
-                if len(self.gesture_history) > self.smoothing_window:
-                    self.gesture_history.pop(0)
-                if len(self.angle_history) > self.smoothing_window:
-                    self.angle_history.pop(0)
-                
-              
-                self.is_fist = self.gesture_history.count("fist") > self.smoothing_window // 2
-                self.is_open_hand = self.gesture_history.count("open") > self.smoothing_window // 2
-                
-                
-             
-                self.hand_angle = sum(self.angle_history) / len(self.angle_history)
-                
-              
-                self.hand_center = (int(landmarks[9].x * frame.shape[1]), 
-                                  int(landmarks[9].y * frame.shape[0]))
-                
-                # Draw hand landmarks
-                mp_drawing.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
-                
-                # Draw angle indicator
-                if self.hand_center:
-                    cv2.circle(frame, self.hand_center, 10, (0, 255, 0), -1)
-                    
-                    # Draw angle line
-                    angle_rad = math.radians(self.hand_angle)
-                    end_x = int(self.hand_center[0] + 50 * math.sin(angle_rad))
-                    end_y = int(self.hand_center[1] - 50 * math.cos(angle_rad))
-                    cv2.line(frame, self.hand_center, (end_x, end_y), (255, 0, 0), 3)
-                
+        if self.mode == "auto":
+            self.update_engine(elapsed_ms)
+        return result
+    
+    def update_engine(self, elapsed_ms):
+        if self.active is self.primary:
+            if self.probe_samples is not None:
+                # Probing MediaPipe from the fallback: decide once the burst is done
+                self.probe_samples.append(elapsed_ms)
+                if len(self.probe_samples) >= self.probe_frames:
+                    # Skip the first sample, it includes palm detection from cold
+                    probe_ms = float(np.median(self.probe_samples[1:]))
+                    self.probe_samples = None
+                    if probe_ms < self.budget_ms * 0.7:
+                        self.inference_ms = probe_ms
+                        self.switch_to(self.primary, f"{probe_ms:.1f} ms fits the budget again")
+                    else:
+                        self.active = self.fallback
+                return
+            
+            self.over_budget = self.over_budget + 1 if self.inference_ms > self.budget_ms else 0
+            if self.over_budget >= self.patience:
+                self.switch_to(self.fallback, f"{self.inference_ms:.1f} ms > {self.budget_ms:.1f} ms budget")
+        else:
+            self.frames_on_fallback += 1
+            if self.frames_on_fallback >= self.probe_interval:
+                self.frames_on_fallback = 0
+                self.probe_samples = []
+                self.active = self.primary
+
+def read_rss_bytes():
+    """Current resident set size, or peak RSS where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+class SoakMonitor:
+    """
+    Long-session soak test: keeps the game in GAME state for `duration` seconds,
+    escalates game_speed, and samples RSS + tracemalloc every `interval` seconds.
+    """
+    def __init__(self, duration, interval=30.0, report_path="soak_report.json", top=15):
+        self.duration = duration
+        self.interval = interval
+        self.report_path = report_path
+        self.top = top
+        self.samples = []
+        self.restarts = 0
+        self.frames = 0
+        self.baseline = None
+        self.last_snapshot = None
+        self.start_time = None
+        self.next_sample = None
+    
+    def start(self, game):
+        tracemalloc.start()
+        self.start_time = time.perf_counter()
+        self.next_sample = self.start_time
+        game.start_game(game.num_players)
+        print(f"Soak test: {self.duration:.0f}s, sampling every {self.interval:.0f}s")
+    
+    def tick(self, game):
+        self.frames += 1
+        now = time.perf_counter()
+        elapsed = now - self.start_time
+        
+        if game.state == GameState.GAME_OVER:
+            self.restarts += 1
+            game.reset_game()
+            game.state = GameState.GAME
+        elif game.state != GameState.GAME:
+            game.state = GameState.GAME
+        
+        # Escalate difficulty linearly to the top speed over the soak
+        target_speed = 2 + 6 * min(elapsed / self.duration, 1.0)
+        game.game_speed = max(game.game_speed, target_speed)
+        
+        if now >= self.next_sample:
+            self.sample(game, elapsed)
+            self.next_sample = now + self.interval
+        
+        if elapsed >= self.duration:
+            self.sample(game, elapsed)
+            self.write_report()
+            game.running = False
+    
+    def sample(self, game, elapsed):
+        snapshot = tracemalloc.take_snapshot()
+        # The first snapshot is the baseline that growth is measured against
+        if self.baseline is None:
+            self.baseline = snapshot
+        self.last_snapshot = snapshot
+        current, peak = tracemalloc.get_traced_memory()
+        self.samples.append({
+            "elapsed": round(elapsed, 2),
+            "frames": self.frames,
+            "rss_bytes": read_rss_bytes(),
+            "traced_bytes": current,
+            "traced_peak_bytes": peak,
+            "obstacles": len(game.obstacles),
+            "collectibles": len(game.collectibles),
+            "game_speed": round(game.game_speed, 2),
+        })
+    
+    def growth_per_hour(self, key):
+        if len(self.samples) < 3:
+            return 0.0
+        # Skip the first sample so warm-up allocations don't count as a leak
+        t = np.array([s["elapsed"] for s in self.samples[1:]])
+        v = np.array([s[key] for s in self.samples[1:]], dtype=np.float64)
+        if np.ptp(t) == 0:
+            return 0.0
+        return float(np.polyfit(t, v, 1)[0] * 3600)
+    
+    def write_report(self):
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        snapshot = self.last_snapshot.filter_traces(filters)
+        top_sites = [
+            {"site": str(stat.traceback), "size_bytes": stat.size, "count": stat.count}
+            for stat in snapshot.statistics("lineno")[:self.top]
+        ]
+        # compare_to() sorts by absolute change, so shrinking sites would show up too
+        growth = [stat for stat in snapshot.compare_to(self.baseline.filter_traces(filters), "lineno")
+                  if stat.size_diff > 0]
+        growth.sort(key=lambda stat: stat.size_diff, reverse=True)
+        top_growth = [
+            {"site": str(stat.traceback), "size_diff_bytes": stat.size_diff, "count_diff": stat.count_diff}
+            for stat in growth[:self.top]
+        ]
+        report = {
+            "duration": self.duration,
+            "frames": self.frames,
+            "restarts": self.restarts,
+            "rss_growth_bytes_per_hour": self.growth_per_hour("rss_bytes"),
+            "traced_growth_bytes_per_hour": self.growth_per_hour("traced_bytes"),
+            "samples": self.samples,
+            "top_allocation_sites": top_sites,
+            "top_growth_sites": top_growth,
+        }
+        tracemalloc.stop()
+        try:
+            with open(self.report_path, "w") as f:
+                json.dump(report, f, indent=2)
+        except Exception as e:
+            print(f"Error saving soak report: {e}")
+        
+        first, last = self.samples[0], self.samples[-1]
+        print(f"Soak finished: {self.frames} frames, {self.restarts} restarts")
+        print(f"RSS: {first['rss_bytes'] / 1e6:.1f} MB -> {last['rss_bytes'] / 1e6:.1f} MB "
+              f"({report['rss_growth_bytes_per_hour'] / 1e6:+.2f} MB/h)")
+        print(f"Traced: {first['traced_bytes'] / 1e6:.1f} MB -> {last['traced_bytes'] / 1e6:.1f} MB "
+              f"({report['traced_growth_bytes_per_hour'] / 1e6:+.2f} MB/h)")
+        print("Top growth sites:")
+        for site in top_growth[:5]:
+            print(f"  {site['size_diff_bytes'] / 1024:+.1f} KiB  {site['site']}")
+        print(f"Full report written to {self.report_path}")
+
+class StackSampler(threading.Thread):
+    """Samples one thread's Python stack at a fixed interval into collapsed-stack counts."""
+    def __init__(self, thread_id, interval=0.002):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts = collections.Counter()
+        self.stop_event = threading.Event()
+    
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.counts[";".join(reversed(stack))] += 1
+    
+    def stop(self):
+        self.stop_event.set()
+        self.join()
+
+class SessionProfiler:
+    """
+    On-demand profiling of a live session. Once armed it waits for the target
+    GameState (or any state), then runs cProfile plus a stack sampler for
+    max_frames frames or until the state changes. It writes
+    profile_<STATE>_<time>.pstats and a matching .collapsed file for flame graphs.
+    The game only keeps a SessionProfiler when profiling was asked for.
+    """
+    def __init__(self, target=None, max_frames=600, output_dir=".", sample_interval=0.002):
+        self.target = target
+        self.max_frames = max_frames
+        self.output_dir = output_dir
+        self.sample_interval = sample_interval
+        self.armed = True
+        self.profile = None
+        self.sampler = None
+        self.state = None
+        self.frames = 0
+    
+    @staticmethod
+    def from_spec(spec, output_dir="."):
+        """Parse "GAME", "GAME:300" or "all:300" (env var / CLI form)."""
+        name, _, frames = spec.partition(":")
+        if name.upper() in ("", "ALL", "ANY", "1"):
+            target = None
+        elif name.upper() in GameState.__members__:
+            target = GameState[name.upper()]
+        else:
+            raise ValueError(f"unknown state {name!r}, expected one of "
+                             f"{', '.join(GameState.__members__)} or 'all'")
+        try:
+            max_frames = int(frames) if frames else 600
+        except ValueError:
+            raise ValueError(f"frame count must be an integer, got {frames!r}")
+        return SessionProfiler(target, max_frames, output_dir)
+    
+    @property
+    def running(self):
+        return self.profile is not None
+    
+    def toggle(self, state):
+        """Hotkey: stop a running capture, otherwise capture the current state."""
+        if self.running:
+            self.stop()
+        else:
+            self.target = state
+            self.armed = True
+            print(f"Profiling armed for {state.name} ({self.max_frames} frames)")
+    
+    def frame(self, state):
+        if self.running:
+            self.frames += 1
+            if state != self.state or self.frames >= self.max_frames:
+                self.stop()
+        if not self.running and self.armed and (self.target is None or state == self.target):
+            self.start(state)
+    
+    def start(self, state):
+        self.armed = False
+        self.state = state
+        self.frames = 0
+        self.sampler = StackSampler(threading.get_ident(), self.sample_interval)
+        self.sampler.start()
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+    
+    def stop(self):
+        if not self.running:
+            return
+        self.profile.disable()
+        self.sampler.stop()
+        
+        base = os.path.join(self.output_dir, f"profile_{self.state.name}_{time.strftime('%Y%m%d_%H%M%S')}")
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            self.profile.dump_stats(base + ".pstats")
+            with open(base + ".collapsed", "w") as f:
+                for stack, count in self.sampler.counts.most_common():
+                    f.write(f"{stack} {count}\n")
+            print(f"Profile of {self.state.name} ({self.frames} frames) written to {base}.pstats / .collapsed")
+            pstats.Stats(self.profile).sort_stats("cumulative").print_stats(10)
+        except Exception as e:
+            print(f"Error saving profile: {e}")
+        self.profile = None
+        self.sampler = None
+
+class SessionRecorder:
+    """
+    Records the composed window and the camera feed to video files. The game
+    loop only copies each frame into a free pooled buffer and queues it; a
+    writer thread converts and encodes with cv2.VideoWriter and hands the buffer
+    back. When no buffer is free the encoder is behind and the frame is dropped,
+    so a slow encoder never stalls the game.
+    """
+    STREAMS = ("screen", "camera")
+    
+    def __init__(self, output_dir="recordings", fps=30, game_fps=60, pool_size=6, codec="mp4v"):
+        self.output_dir = output_dir
+        self.fps = fps
+        self.every = max(1, round(game_fps / fps))  # record every Nth game frame
+        self.pool_size = pool_size
+        self.codec = codec
+        self.thread = None
+    
+    @property
+    def running(self):
+        return self.thread is not None
+    
+    def toggle(self):
+        if self.running:
+            self.stop()
+        else:
+            self.start()
+    
+    def start(self):
+        self.base = os.path.join(self.output_dir, f"session_{time.strftime('%Y%m%d_%H%M%S')}")
+        self.pools = {}  # stream -> (shape, queue of free buffers)
+        self.queue = queue.Queue(maxsize=self.pool_size * len(self.STREAMS))
+        self.writers = {}
+        self.frames = 0
+        self.submitted = dict.fromkeys(self.STREAMS, 0)
+        self.dropped = dict.fromkeys(self.STREAMS, 0)
+        self.written = dict.fromkeys(self.STREAMS, 0)
+        self.encode_seconds = 0.0
+        self.start_time = time.perf_counter()
+        self.thread = threading.Thread(target=self.run, name="session-recorder", daemon=True)
+        self.thread.start()
+        print(f"Recording to {self.base}_*.mp4 at {self.fps} fps")
+    
+    def frame(self, game):
+        """Called once per game frame, after drawing."""
+        self.frames += 1
+        if self.frames % self.every:
+            return
+        window = game.window
+        if window.get_bytesize() == 4:
+            # Raw rows straight out of the surface: a plain memcpy, no transpose
+            width, height = window.get_size()
+            rows = np.frombuffer(window.get_buffer(), dtype=np.uint8).reshape(height, -1)
+            code = cv2.COLOR_BGRA2BGR if window.get_masks()[0] == 0xFF0000 else cv2.COLOR_RGBA2BGR
+            self.submit("screen", rows[:, :width * 4].reshape(height, width, 4), code)
+            del rows  # unlock the display surface before flip
         else:
-            # No hand detected
-            self.is_fist = False
-            self.is_open_hand = False
-            self.hand_angle = 0
-            self.hand_center = None
+            self.submit("screen", pygame.surfarray.pixels3d(window).swapaxes(0, 1), cv2.COLOR_RGB2BGR)
+        if game.last_frame is not None:
+            self.submit("camera", game.last_frame)
+    
+    def submit(self, stream, pixels, code=None):
+        self.submitted[stream] += 1
+        pool = self.pools.get(stream)
+        if pool is None or pool[0] != pixels.shape:
+            pool = (pixels.shape, queue.Queue())
+            for _ in range(self.pool_size):
+                pool[1].put(np.empty(pixels.shape, dtype=np.uint8))
+            self.pools[stream] = pool
+        try:
+            buffer = pool[1].get_nowait()
+        except queue.Empty:
+            self.dropped[stream] += 1
+            return
+        # The one copy the game loop pays for
+        np.copyto(buffer, pixels)
+        try:
+            self.queue.put_nowait((stream, buffer, code))
+        except queue.Full:
+            pool[1].put(buffer)
+            self.dropped[stream] += 1
+    
+    def open_writer(self, stream, shape):
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = f"{self.base}_{stream}.mp4"
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*self.codec), self.fps, (shape[1], shape[0]))
+        if not writer.isOpened():
+            print(f"Could not open video writer for {path}")
+            writer = None
+        return writer, (shape[1], shape[0])
+    
+    def run(self):
+        converted = {}
+        resized = {}
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            stream, buffer, code = item
+            start = time.perf_counter()
+            if stream not in self.writers:
+                self.writers[stream] = self.open_writer(stream, buffer.shape)
+            writer, size = self.writers[stream]
+            if writer is not None:
+                frame = buffer
+                if code is not None:
+                    dst = converted.get(stream)
+                    if dst is None or dst.shape[:2] != buffer.shape[:2]:
+                        dst = None
+                    frame = converted[stream] = cv2.cvtColor(buffer, code, dst=dst)
+                if (frame.shape[1], frame.shape[0]) != size:
+                    # The window was resized mid-recording; the file keeps its first size
+                    dst = resized.get(stream)
+                    if dst is None or dst.shape[:2] != (size[1], size[0]):
+                        dst = None
+                    frame = resized[stream] = cv2.resize(frame, size, dst=dst, interpolation=cv2.INTER_AREA)
+                writer.write(frame)
+                self.written[stream] += 1
+            self.encode_seconds += time.perf_counter() - start
             
-        return self.is_fist, self.is_open_hand, self.hand_angle
+            # Back to its pool, unless the pool was replaced after a resize
+            pool = self.pools.get(stream)
+            if pool is not None and pool[0] == buffer.shape:
+                pool[1].put(buffer)
+        
+        for writer, _ in self.writers.values():
+            if writer is not None:
+                writer.release()
     
-    def get_action_and_steering(self):
-        if self.is_fist:
-            return "brake", self.hand_angle
-        elif self.is_open_hand:
-            return "accelerate", self.hand_angle
+    def stop(self):
+        if not self.running:
+            return
+        self.queue.put(None)
+        self.thread.join()
+        self.thread = None
+        
+        elapsed = time.perf_counter() - self.start_time
+        written = sum(self.written.values())
+        print(f"Recording stopped after {elapsed:.1f}s: "
+              f"encoder {written / max(self.encode_seconds, 1e-9):.0f} frames/s busy "
+              f"({self.encode_seconds / max(elapsed, 1e-9):.0%} of wall time)")
+        for stream in self.STREAMS:
+            if self.submitted[stream]:
+                print(f"  {stream}: {self.written[stream]} written, {self.dropped[stream]} dropped "
+                      f"of {self.submitted[stream]} -> {self.base}_{stream}.mp4")
+
+# Quality levels, best first. QualityGovernor steps through them to hold the frame budget.
+QUALITY_LEVELS = [
+    {"name": "High", "preview_size": (160, 120), "preview_interval": 1, "inference_scale": 1.0,
+     "inference_interval": 1, "landmarks": True, "animation": True, "wheel_rotation": True, "particles": 1.0},
+    {"name": "Medium", "preview_size": (160, 120), "preview_interval": 2, "inference_scale": 0.75,
+     "inference_interval": 1, "landmarks": True, "animation": True, "wheel_rotation": True, "particles": 0.5},
+    {"name": "Low", "preview_size": (120, 90), "preview_interval": 3, "inference_scale": 0.5,
+     "inference_interval": 2, "landmarks": False, "animation": False, "wheel_rotation": True, "particles": 0.25},
+    {"name": "Minimal", "preview_size": (120, 90), "preview_interval": 6, "inference_scale": 0.5,
+     "inference_interval": 3, "landmarks": False, "animation": False, "wheel_rotation": False, "particles": 0.0},
+]
+
+class QualityGovernor:
+    """
+    Watches recent frame work times (excluding the clock.tick sleep and the
+    wait for camera frames) and steps
+    quality down as soon as a window runs over budget, and back up only after
+    several windows in a row with plenty of headroom.
+    """
+    def __init__(self, fps=60, window=30, level=0, adaptive=True):
+        self.budget_ms = 1000.0 / fps
+        self.window = window
+        self.frame_times = collections.deque(maxlen=window)
+        self.level = level
+        self.adaptive = adaptive
+        self.frames = 0
+        self.good_windows = 0
+        self.windows_to_upgrade = 4
+    
+    @property
+    def settings(self):
+        return QUALITY_LEVELS[self.level]
+    
+    def record(self, frame_ms):
+        """Add one frame time; returns True when the quality level changed."""
+        self.frame_times.append(frame_ms)
+        self.frames += 1
+        if not self.adaptive or self.frames % self.window:
+            return False
+        
+        p90 = float(np.percentile(self.frame_times, 90))
+        if p90 > self.budget_ms * 0.95:
+            self.good_windows = 0
+            if self.level < len(QUALITY_LEVELS) - 1:
+                self.level += 1
+                print(f"Quality -> {self.settings['name']} (p90 frame {p90:.1f} ms > {self.budget_ms:.1f} ms budget)")
+                return True
+        elif p90 < self.budget_ms * 0.6:
+            self.good_windows += 1
+            if self.good_windows >= self.windows_to_upgrade and self.level > 0:
+                self.level -= 1
+                self.good_windows = 0
+                print(f"Quality -> {self.settings['name']} (p90 frame {p90:.1f} ms, headroom regained)")
+                return True
+        else:
+            self.good_windows = 0
+        return False
+
+class AudioEngine:
+    """
+    Every cue is synthesized with NumPy into a pygame Sound at startup, so playing
+    one is a channel lookup: no file I/O or decoding in the game loop. Each cue
+    group has a reserved channel (a new cue cuts off the last one in its group),
+    and each cue has a minimum replay interval.
+    """
+    # name -> (reserved channel, minimum seconds between plays)
+    CUES = {
+        "accelerate": (1, 0.25),
+        "brake": (1, 0.25),
+        "coin": (2, 0.05),
+        "boost": (2, 0.2),
+        "shield": (2, 0.2),
+        "crash": (3, 0.5),
+    }
+    ENGINE_CHANNEL = 0
+    ENGINE_STEPS = 8
+    
+    def __init__(self, volume=0.6):
+        self.available = False
+        self.volume = volume
+        self.sounds = {}
+        self.engine_sounds = []
+        self.engine_step = None
+        self.last_played = {name: 0.0 for name in self.CUES}
+        try:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+        except pygame.error as e:
+            print(f"Audio disabled: {e}")
+            return
+        
+        self.rate, self.size, self.channels = pygame.mixer.get_init()
+        if self.size not in (-16, 32):
+            print(f"Audio disabled: unsupported mixer format {self.size}")
+            return
+        pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), 8))
+        pygame.mixer.set_reserved(4)
+        self.reserved = [pygame.mixer.Channel(i) for i in range(4)]
+        
+        start = time.perf_counter()
+        self.sounds = {
+            "accelerate": self.make_sound(self.tone(440, 0.08, sweep_to=660)),
+            "brake": self.make_sound(self.tone(440, 0.1, sweep_to=220)),
+            "coin": self.make_sound(np.concatenate([self.tone(988, 0.06, decay=0),
+                                                    self.tone(1319, 0.12)])),
+            "boost": self.make_sound(self.tone(300, 0.25, sweep_to=1200, decay=2)),
+            "shield": self.make_sound(sum(self.tone(f, 0.2, decay=3) for f in (523, 659, 784)) / 3),
+            "crash": self.make_sound(0.7 * self.noise(0.4, decay=8) + 0.5 * self.tone(80, 0.4, decay=6)),
+        }
+        for step in range(self.ENGINE_STEPS):
+            self.engine_sounds.append(self.make_sound(self.engine_loop(70 + 130 * step / (self.ENGINE_STEPS - 1))))
+        self.available = True
+        print(f"Audio ready: {len(self.sounds)} cues + {self.ENGINE_STEPS} engine pitches "
+              f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+    
+    def tone(self, freq, duration, sweep_to=None, decay=12):
+        t = np.arange(int(self.rate * duration)) / self.rate
+        if sweep_to is None:
+            phase = 2 * np.pi * freq * t
+        else:
+            # Linear chirp: integrate the instantaneous frequency
+            phase = 2 * np.pi * (freq * t + (sweep_to - freq) * t * t / (2 * duration))
+        wave = np.sin(phase) * np.exp(-decay * t)
+        # Short fade in/out so cues start and stop without clicks
+        fade = min(len(wave) // 2, int(self.rate * 0.004))
+        if fade:
+            ramp = np.linspace(0, 1, fade)
+            wave[:fade] *= ramp
+            wave[-fade:] *= ramp[::-1]
+        return wave
+    
+    def noise(self, duration, decay=8):
+        t = np.arange(int(self.rate * duration)) / self.rate
+        return np.random.default_rng(0).uniform(-1, 1, len(t)) * np.exp(-decay * t)
+    
+    def engine_loop(self, freq):
+        # A whole number of cycles, so the loop point is seamless
+        cycles = max(1, round(freq * 0.25))
+        t = np.arange(round(self.rate * cycles / freq)) / self.rate
+        base = 2 * np.pi * freq * t
+        return 0.6 * np.sin(base) + 0.3 * np.sin(2 * base) + 0.15 * np.sin(3 * base)
+    
+    def make_sound(self, wave):
+        wave = np.clip(wave * self.volume, -1, 1)
+        if self.size == 32:
+            data = wave.astype(np.float32)
         else:
-            return "coast", self.hand_angle
+            data = (wave * 32767).astype(np.int16)
+        if self.channels > 1:
+            data = np.repeat(data[:, None], self.channels, axis=1)
+        return pygame.sndarray.make_sound(np.ascontiguousarray(data))
+    
+    def play(self, name):
+        sound = self.sounds.get(name)
+        if sound is None:
+            return
+        channel, min_interval = self.CUES[name]
+        now = time.perf_counter()
+        if now - self.last_played[name] < min_interval:
+            return
+        self.last_played[name] = now
+        self.reserved[channel].play(sound)
+    
+    def update_engine(self, speed_fraction):
+        if not self.available:
+            return
+        step = int(round(max(0.0, min(1.0, speed_fraction)) * (self.ENGINE_STEPS - 1)))
+        if step != self.engine_step:
+            self.engine_step = step
+            self.reserved[self.ENGINE_CHANNEL].play(self.engine_sounds[step], loops=-1)
+            self.reserved[self.ENGINE_CHANNEL].set_volume(0.3 + 0.4 * step / (self.ENGINE_STEPS - 1))
+    
+    def stop_engine(self):
+        if self.engine_step is not None:
+            self.engine_step = None
+            self.reserved[self.ENGINE_CHANNEL].stop()
+
+class ScriptedDriver:
+    """
+    Drives without a camera by replaying (ticks, action, steering) segments in
+    a loop. The script is keyed off the course tick, so runs are reproducible.
+    """
+    DEFAULT_SCRIPT = [
+        (120, "accelerate", 0),
+        (20, "accelerate", -15),
+        (40, "coast", 0),
+        (20, "accelerate", 15),
+        (60, "accelerate", 0),
+        (15, "brake", 0),
+        (20, "accelerate", 15),
+        (40, "coast", 0),
+        (20, "accelerate", -15),
+    ]
+    
+    def __init__(self, script=None):
+        self.script = script or self.DEFAULT_SCRIPT
+        self.length = sum(ticks for ticks, _, _ in self.script)
+    
+    def drive(self, game, player):
+        # Players run the script half a loop apart so they do not move in lockstep
+        t = (game.course_tick + player * self.length // 2) % self.length
+        for ticks, action, steering in self.script:
+            if t < ticks:
+                return action, steering
+            t -= ticks
+        return "coast", 0
+
+class RandomDriver:
+    """Holds a random action and steering for 10-60 ticks at a time, mostly accelerating."""
+    ACTIONS = ["accelerate", "coast", "brake"]
+    
+    def __init__(self, seed=None, weights=(0.7, 0.2, 0.1), max_steering=30):
+        self.rng = np.random.default_rng(seed)
+        self.weights = weights
+        self.max_steering = max_steering
+        self.segments = [None] * MAX_PLAYERS  # player -> (until tick, action, steering)
+    
+    def drive(self, game, player):
+        segment = self.segments[player]
+        # A new segment when this one runs out, or when the tick went back (new game)
+        if segment is None or not segment[0] - 60 <= game.course_tick < segment[0]:
+            action = self.ACTIONS[self.rng.choice(len(self.ACTIONS), p=self.weights)]
+            steering = float(self.rng.uniform(-self.max_steering, self.max_steering))
+            segment = (game.course_tick + int(self.rng.integers(10, 61)), action, steering)
+            self.segments[player] = segment
+        return segment[1], segment[2]
+
+class LaneAvoidDriver:
+    """
+    Greedy lane avoidance. Each tick every candidate x is scored by the obstacles
+    about to reach it (sooner ones weigh more), the obstacles that arrive while
+    the car is still crossing over, and the collectibles on the way. The car
+    steers for the best x while heading down, pinned to the bottom edge at speed.
+    """
+    def __init__(self, lanes=15, margin=30, horizon=120, gain=1.5, max_steering=45):
+        self.lane_x = np.linspace(50, PLAYFIELD_WIDTH - 50, lanes)
+        self.margin = margin
+        self.horizon = horizon  # ticks of look-ahead
+        self.gain = gain
+        self.max_steering = max_steering
+        self.targets = [None] * MAX_PLAYERS
+    
+    def lane_costs(self, game, car):
+        lane_x = self.lane_x
+        costs = 0.002 * np.abs(lane_x - car.x)
+        # Ticks the car needs to slide over to each lane
+        travel = np.abs(lane_x - car.x) / max(car.speed, 1.0)
+        
+        if game.obstacles:
+            xs = np.array([o.x for o in game.obstacles], dtype=np.float64)
+            ys = np.array([o.y for o in game.obstacles], dtype=np.float64)
+            weights = np.array([0.3 if o.type == "pothole" else 1.0 for o in game.obstacles])
+            arrival = (car.y - ys) / game.game_speed
+            live = (arrival > -8) & (arrival < self.horizon)
+            urgency = weights * live * (self.horizon / np.maximum(arrival, 4))
+            
+            # Obstacles coming down over a candidate lane
+            overlap = np.abs(xs[None, :] - lane_x[:, None]) < self.margin
+            costs += (overlap * urgency).sum(axis=1)
+            
+            # Obstacles in the way that land before the car is past them
+            low = np.minimum(lane_x, car.x)[:, None] - self.margin
+            high = np.maximum(lane_x, car.x)[:, None] + self.margin
+            crossing = (xs > low) & (xs < high) & (arrival[None, :] < travel[:, None] + 20)
+            costs += 2.0 * (crossing * urgency).sum(axis=1)
+        
+        if game.collectibles:
+            xs = np.array([c.x for c in game.collectibles], dtype=np.float64)
+            arrival = (car.y - np.array([c.y for c in game.collectibles], dtype=np.float64)) / game.game_speed
+            reachable = (arrival > travel[:, None]) & (arrival < self.horizon)
+            overlap = np.abs(xs[None, :] - lane_x[:, None]) < self.margin / 2
+            costs -= 0.5 * (overlap & reachable).sum(axis=1)
+        return costs
+    
+    def drive(self, game, player):
+        car = game.cars[player]
+        costs = self.lane_costs(game, car)
+        best = int(np.argmin(costs))
+        target = self.targets[player]
+        # Keep the current lane unless another is clearly better, to avoid dithering
+        if target is None or costs[best] < costs[target] - 0.1:
+            target = best
+        self.targets[player] = target
+        
+        # Heading down with a sideways lean towards the target x
+        desired = math.degrees(math.atan2(40, self.lane_x[target] - car.x))
+        error = (desired - car.angle + 180) % 360 - 180
+        steering = max(-self.max_steering, min(self.max_steering, error * self.gain))
+        return "accelerate", steering
+
+DRIVERS = {
+    "scripted": ScriptedDriver,
+    "random": RandomDriver,
+    "greedy": LaneAvoidDriver,
+}
+
+def make_driver(name, seed=None):
+    if name == "random":
+        return RandomDriver(seed)
+    return DRIVERS[name]()
+
+class AssetManager:
+    """
+    Finds images under assets/<kind>/ and decodes them on a background thread.
+    Loading, scaling and convert_alpha all happen off the frame loop. get() never
+    blocks: it returns None until the surface is ready. Finished surfaces live in
+    an LRU cache bounded by pixel bytes.
+    """
+    EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+    
+    def __init__(self, root="assets", max_bytes=64 * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.cache = collections.OrderedDict()  # (path, size) -> Surface, oldest first
+        self.cache_bytes = 0
+        self.pending = set()
+        self.failed = set()
+        self.jobs = queue.Queue()
+        self.done = collections.deque()  # filled by the loader thread, drained by poll()
+        self.thread = threading.Thread(target=self.run, name="asset-loader", daemon=True)
+        self.thread.start()
+    
+    def discover(self, kind):
+        """[(display name, path)] for every image in assets/<kind>/, sorted by file name."""
+        folder = os.path.join(self.root, kind)
+        try:
+            names = sorted(os.listdir(folder))
+        except OSError:
+            return []
+        return [(os.path.splitext(name)[0].replace("_", " ").title(), os.path.join(folder, name))
+                for name in names if name.lower().endswith(self.EXTENSIONS)]
+    
+    def get(self, path, size=None):
+        key = (path, size)
+        surface = self.cache.get(key)
+        if surface is not None:
+            self.cache.move_to_end(key)
+            return surface
+        self.prefetch(path, size)
+        return None
+    
+    def prefetch(self, path, size=None):
+        key = (path, size)
+        if key in self.cache or key in self.pending or key in self.failed:
+            return
+        self.pending.add(key)
+        self.jobs.put(key)
+    
+    def poll(self):
+        """Move finished decodes into the cache; called once per frame."""
+        while self.done:
+            key, surface = self.done.popleft()
+            self.pending.discard(key)
+            if surface is None:
+                self.failed.add(key)
+                continue
+            self.cache[key] = surface
+            self.cache_bytes += surface.get_pitch() * surface.get_height()
+            while self.cache_bytes > self.max_bytes and len(self.cache) > 1:
+                _, old = self.cache.popitem(last=False)
+                self.cache_bytes -= old.get_pitch() * old.get_height()
+    
+    def run(self):
+        while True:
+            key = self.jobs.get()
+            if key is None:
+                return
+            path, size = key
+            try:
+                surface = pygame.image.load(path)
+                if size is not None and surface.get_size() != size:
+                    # Scale before convert_alpha: converting a full-size image (the wheel
+                    # is 5703x5698) holds the GIL long enough to stall the frame loop
+                    if surface.get_bitsize() >= 24:
+                        surface = pygame.transform.smoothscale(surface, size)
+                    else:
+                        surface = pygame.transform.scale(surface, size)
+                surface = surface.convert_alpha()
+            except (pygame.error, OSError, ValueError) as e:
+                print(f"Could not load {path}: {e}")
+                surface = None
+            self.done.append((key, surface))
+    
+    def close(self):
+        self.jobs.put(None)
 
 class InclusiveVelocity:
-    def __init__(self):
+    def __init__(self, frame_source=None, soak=None, gesture_engine="auto", profiler=None, quality="auto",
+                 window_size=(PLAYFIELD_WIDTH, PLAYFIELD_HEIGHT), fullscreen=False, render_scale=1.0,
+                 smooth_scale=False,
+                 driver=None, recorder=None, profile_dir="profiles", contour_background=False):
         self.frame_count = 0
         self.last_gesture_time = 0  # for gesture rate limiting
 
 
-        self.screen = pygame.display.set_mode((800, 600))
+        # Menus draw into self.screen in 800x600 logical coordinates; the race
+        # is rendered at render_scale of the viewport, with the HUD at native size
+        self.render_scale = render_scale
+        self.smooth_scale = smooth_scale
+        if fullscreen:
+            self.window = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+        else:
+            self.window = pygame.display.set_mode(window_size, pygame.RESIZABLE)
         pygame.display.set_caption("Inclusive Velocity - Gesture Racing")
+        self.update_viewport()
         self.clock = pygame.time.Clock()
         self.running = True
         
@@ -330,34 +2072,48 @@ class InclusiveVelocity:
         self.nav_cooldown = 0
         self.nav_threshold = 50    # pixels
         self.nav_cooldown_time = 10 # frames
+        self.nav_fist_held = False  # a fist confirms once, then must open again
         # Camera setup
-        self.cap = cv2.VideoCapture(0)
-        self.gesture_detector = GestureDetector(sensitivity=1.0)
+        self.cap = open_frame_source(frame_source)
+        self.capture = FrameCapture(self.cap)
+        self.last_frame = None  # newest mirrored camera frame, owned until replaced
+        self.preview_buffers = {}
+        primary = None if gesture_engine == "contour" else GestureDetector(sensitivity=1.0)
+        self.gesture_detector = GestureEngineSwitcher(
+            primary, ContourGestureDetector(sensitivity=1.0, use_background=contour_background),
+            mode=gesture_engine)
         
       
         self.obstacles = []
         self.collectibles = []
+        self.collision_masks = CollisionMasks()
+        self.particles = ParticleSystem()
         
         # Game variables
         self.score = 0
         self.distance = 0
         self.coins = 0
         self.game_speed = 2
-        self.spawn_timer = 0
+        self.course = None
+        self.course_tick = 0
         self.last_action = "coast"
         self.current_steering = 0
+        self.num_players = 1
+        self.cars = []
+        self.driver = driver  # None = players steer with gestures
         
         # settings
         self.high_contrast = False
         self.audio_feedback = True
         self.gesture_sensitivity = 1.0
+        self.course_seed = None  # None = fresh random course every game
         # Car-physics adjustable parameters 
         self.default_friction = 0.9        
         self.default_acceleration = 0.3    
         self.default_max_speed = 8         # top speed normally
         self.default_boost_duration = 120  # frames of boost when collected
       
-        self.default_turn_speed = 5        # not currently used directly in Car.update but can incorporate if desired
+        self.default_turn_speed = 5        # steering gain, 5 = 0.3 degrees of turn per degree of hand tilt
         # Ranges for safety:
        
 
@@ -366,16 +2122,85 @@ class InclusiveVelocity:
         self.settings_selected = 0
         
         # UI elements
-        self.menu_options = ["Start Game", "Calibration", "Settings", "Quit"]
-        self.wheel_img = pygame.image.load("steering_wheel.png").convert_alpha()
-        self.wheel_img = pygame.transform.smoothscale(self.wheel_img, (80, 80))  # Resize
+        self.menu_options = ["Start Game", "Two Player", "Calibration", "Settings", "Quit"]
+        self.audio = AudioEngine()
+        
+        # Images (wheel, car skins, tracks) decode in the background; the built-in
+        # drawn car and road stand in until they are ready, or if there are none
+        self.assets = AssetManager()
+        self.car_options = [("Classic", None)] + self.assets.discover("cars")
+        self.track_options = [("Classic Road", None)] + self.assets.discover("tracks")
+        self.car_choice = 0
+        self.track_choice = 0
+        self.pending_players = 1
 
         self.selected_option = 0
         
        
         self.load_settings()
         
+        self.soak = soak
+        self.profiler = profiler
+        self.profile_dir = profiler.output_dir if profiler is not None else profile_dir
+        self.recorder = recorder if recorder is not None else SessionRecorder()
+        
+        level_names = [level["name"].lower() for level in QUALITY_LEVELS]
+        if quality in level_names:
+            self.quality = QualityGovernor(level=level_names.index(quality), adaptive=False)
+        else:
+            self.quality = QualityGovernor()
+        self.apply_quality()
+        
    
+    def update_viewport(self):
+        """Fit the 4:3 playfield into the window and (re)build the render targets."""
+        window_width, window_height = self.window.get_size()
+        fit = min(window_width / PLAYFIELD_WIDTH, window_height / PLAYFIELD_HEIGHT)
+        width, height = int(PLAYFIELD_WIDTH * fit), int(PLAYFIELD_HEIGHT * fit)
+        self.viewport = pygame.Rect((window_width - width) // 2, (window_height - height) // 2, width, height)
+        self.letterboxed = self.viewport.size != (window_width, window_height)
+        if self.letterboxed:
+            self.viewport_surface = self.window.subsurface(self.viewport)
+        else:
+            self.viewport_surface = self.window
+        
+        # Logical menu canvas; skipped when the viewport already is 800x600
+        if self.viewport.size == (PLAYFIELD_WIDTH, PLAYFIELD_HEIGHT):
+            self.screen = self.viewport_surface
+        else:
+            self.screen = pygame.Surface((PLAYFIELD_WIDTH, PLAYFIELD_HEIGHT)).convert()
+        
+        # Offscreen world at the internal render scale; drawn straight into the
+        # viewport when that scale is 1
+        playfield_size = (max(1, round(width * self.render_scale)), max(1, round(height * self.render_scale)))
+        if playfield_size == self.viewport.size:
+            self.playfield = self.viewport_surface
+        else:
+            self.playfield = pygame.Surface(playfield_size).convert()
+        self.world_scale = playfield_size[0] / PLAYFIELD_WIDTH
+        
+        # The HUD keeps the 800x600 layout but is rendered at the viewport's resolution
+        self.hud_scale = fit
+        self.hud_font = pygame.font.Font(None, max(8, round(36 * fit)))
+        self.hud_small_font = pygame.font.Font(None, max(8, round(24 * fit)))
+        self.pause_overlay = None
+        # Filtered upscaling costs several times more than a reduced render
+        # scale saves, so it is opt-in (and needs a 24/32-bit window)
+        if self.smooth_scale and self.window.get_bitsize() >= 24:
+            self.scale_surface = pygame.transform.smoothscale
+        else:
+            self.scale_surface = pygame.transform.scale
+        self.window.fill((0, 0, 0))
+    
+    def hud_pos(self, x, y):
+        """Map an 800x600 layout position to window pixels."""
+        return (self.viewport.x + round(x * self.hud_scale), self.viewport.y + round(y * self.hud_scale))
+    
+    def present(self, surface):
+        """Scale a render target into the viewport, once per frame."""
+        if surface is not self.viewport_surface:
+            self.scale_surface(surface, self.viewport.size, self.viewport_surface)
+    
     def load_settings(self):
         try:
             if os.path.exists("settings.json"):
@@ -384,12 +2209,17 @@ class InclusiveVelocity:
                     self.high_contrast = settings.get("high_contrast", False)
                     self.audio_feedback = settings.get("audio_feedback", True)
                     self.gesture_sensitivity = settings.get("gesture_sensitivity", 1.0)
+                    self.course_seed = settings.get("course_seed", None)
                     # Load car-physics settings (with safe defaults if missing)
                     self.default_friction = settings.get("default_friction", self.default_friction)
                     self.default_acceleration = settings.get("default_acceleration", self.default_acceleration)
                     self.default_max_speed = settings.get("default_max_speed", self.default_max_speed)
                     self.default_boost_duration = settings.get("default_boost_duration", self.default_boost_duration)
                     self.default_turn_speed = settings.get("default_turn_speed", self.default_turn_speed)
+                    paths = [path for _, path in self.car_options]
+                    self.car_choice = paths.index(settings.get("car")) if settings.get("car") in paths else 0
+                    paths = [path for _, path in self.track_options]
+                    self.track_choice = paths.index(settings.get("track")) if settings.get("track") in paths else 0
         except Exception as e:
             print(f"Error loading settings: {e}")
 
@@ -400,12 +2230,15 @@ class InclusiveVelocity:
             "high_contrast": self.high_contrast,
             "audio_feedback": self.audio_feedback,
             "gesture_sensitivity": self.gesture_sensitivity,
+            "course_seed": self.course_seed,
             # Car-physics settings
             "default_friction": self.default_friction,
             "default_acceleration": self.default_acceleration,
             "default_max_speed": self.default_max_speed,
             "default_boost_duration": self.default_boost_duration,
-            "default_turn_speed": self.default_turn_speed
+            "default_turn_speed": self.default_turn_speed,
+            "car": self.car_options[self.car_choice][1],
+            "track": self.track_options[self.track_choice][1]
         }
         try:
             with open("settings.json", "w") as f:
@@ -418,14 +2251,32 @@ class InclusiveVelocity:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.running = False
+            elif event.type == pygame.VIDEORESIZE:
+                self.update_viewport()
             elif event.type == pygame.KEYDOWN:
-                if self.state == GameState.MENU:
+                if event.key == pygame.K_F9:
+                    # Profile the current state on demand
+                    if self.profiler is None:
+                        self.profiler = SessionProfiler(self.state, output_dir=self.profile_dir)
+                    self.profiler.toggle(self.state)
+                elif event.key == pygame.K_F10:
+                    self.recorder.toggle()
+                elif self.state == GameState.MENU:
                     if event.key == pygame.K_UP:
                         self.selected_option = (self.selected_option - 1) % len(self.menu_options)
                     elif event.key == pygame.K_DOWN:
                         self.selected_option = (self.selected_option + 1) % len(self.menu_options)
                     elif event.key == pygame.K_RETURN:
                         self.handle_menu_selection()
+                elif self.state in (GameState.CAR_SELECT, GameState.TRACK_SELECT):
+                    if event.key in (pygame.K_LEFT, pygame.K_UP):
+                        self.browse_selection(-1)
+                    elif event.key in (pygame.K_RIGHT, pygame.K_DOWN):
+                        self.browse_selection(1)
+                    elif event.key == pygame.K_RETURN:
+                        self.confirm_selection()
+                    elif event.key == pygame.K_ESCAPE:
+                        self.back_from_selection()
                 elif self.state == GameState.GAME:
                     if event.key == pygame.K_ESCAPE:
                         self.state = GameState.PAUSE
@@ -434,8 +2285,7 @@ class InclusiveVelocity:
                         self.state = GameState.GAME
                 elif self.state == GameState.GAME_OVER:
                     if event.key == pygame.K_RETURN:
-                        self.reset_game()
-                        self.state = GameState.MENU
+                        self.return_to_menu()
                 elif self.state == GameState.SETTINGS:
                     if event.key == pygame.K_UP:
                         # Move selection up
@@ -456,26 +2306,58 @@ class InclusiveVelocity:
 
     
     def handle_menu_selection(self):
-        if self.selected_option == 0:  # Start Game
-            self.reset_game()
-            self.state = GameState.GAME
-        elif self.selected_option == 1:  # Calibration
+        option = self.menu_options[self.selected_option]
+        if option == "Start Game":
+            self.pending_players = 1
+            self.state = GameState.CAR_SELECT
+        elif option == "Two Player":
+            self.pending_players = 2
+            self.state = GameState.CAR_SELECT
+        elif option == "Calibration":
+            self.gesture_detector.set_num_players(1)
             self.state = GameState.CALIBRATION
-        elif self.selected_option == 2:  # Settings
+        elif option == "Settings":
             self.state = GameState.SETTINGS
-        elif self.selected_option == 3:  # Quit
+        elif option == "Quit":
             self.running = False
+
+    def start_game(self, num_players):
+        self.num_players = num_players
+        # Both hands are tracked by the same MediaPipe pass, never a second one
+        self.gesture_detector.set_num_players(num_players)
+        self.reset_game()
+        self.state = GameState.GAME
+    
+    def return_to_menu(self):
+        self.reset_game()
+        # Menu navigation reads player 1's hand, which a 2P detector may assign to player 2
+        self.gesture_detector.set_num_players(1)
+        self.state = GameState.MENU
  
+    def browse_selection(self, direction):
+        if self.state == GameState.CAR_SELECT:
+            self.car_choice = (self.car_choice + direction) % len(self.car_options)
+        else:
+            self.track_choice = (self.track_choice + direction) % len(self.track_options)
+    
+    def confirm_selection(self):
+        if self.state == GameState.CAR_SELECT:
+            self.state = GameState.TRACK_SELECT
+        else:
+            self.save_settings()
+            self.start_game(self.pending_players)
+    
+    def back_from_selection(self):
+        if self.state == GameState.TRACK_SELECT:
+            self.state = GameState.CAR_SELECT
+        else:
+            self.state = GameState.MENU
+    
     def handle_menu_gestures(self):
-        ret, frame = self.cap.read()
-        if not ret:
+        if self.capture_frame() is None:
             return
 
-        frame = cv2.flip(frame, 1)
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        self.gesture_detector.detect_gesture(frame)
         center = self.gesture_detector.hand_center
-        results = self.gesture_detector.hands.process(rgb_frame)
 
         # 1) Always handle left‑swipe first (quit/back)
         if center and self.nav_cooldown == 0 and self.nav_last_pos:
@@ -492,6 +2374,7 @@ class InclusiveVelocity:
             if self.gesture_detector.is_fist:
                 self.handle_menu_selection()
                 self.nav_cooldown = self.nav_cooldown_time
+                self.nav_fist_held = True
 
             # b) Else, tilt up/down to move selection
             else:
@@ -515,15 +2398,10 @@ class InclusiveVelocity:
 
   
     def handle_settings_gestures(self):
-        ret, frame = self.cap.read()
-        if not ret:
+        if self.capture_frame() is None:
             return
 
-        frame = cv2.flip(frame, 1)
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        self.gesture_detector.detect_gesture(frame)
         center = self.gesture_detector.hand_center
-        results = self.gesture_detector.hands.process(rgb_frame)
 
         # 1) Left‑swipe to go back (highest priority)
         if center and self.nav_cooldown == 0 and self.nav_last_pos:
@@ -569,13 +2447,98 @@ class InclusiveVelocity:
 
 
   
+    def handle_select_gestures(self):
+        if self.capture_frame() is None:
+            return
+
+        center = self.gesture_detector.hand_center
+
+        # 1) Left‑swipe to go back (highest priority)
+        if center and self.nav_cooldown == 0 and self.nav_last_pos:
+            dx = center[0] - self.nav_last_pos[0]
+            if dx < -2 * self.nav_threshold:
+                self.back_from_selection()
+                self.nav_cooldown = self.nav_cooldown_time
+                self.nav_last_pos = center
+                return
+
+        # 2) Fist = choose, tilt up/down = browse. The fist that picked the
+        # previous screen has to open before it can confirm this one
+        if center and self.nav_cooldown == 0:
+            if self.gesture_detector.is_fist:
+                if not self.nav_fist_held:
+                    self.confirm_selection()
+                    self.nav_cooldown = self.nav_cooldown_time
+            elif self.nav_last_pos:
+                dy = center[1] - self.nav_last_pos[1]
+                dx = center[0] - self.nav_last_pos[0]
+                if abs(dy) > abs(dx) and abs(dy) > 10:
+                    self.browse_selection(-1 if dy < 0 else 1)
+                    self.nav_cooldown = self.nav_cooldown_time
+
+            self.nav_last_pos = center
+        self.nav_fist_held = self.gesture_detector.is_fist
+
+        # 3) Cooldown tick
+        if self.nav_cooldown > 0:
+            self.nav_cooldown -= 1
+
+    def capture_frame(self):
+        """Read one mirrored camera frame and run gesture detection on it."""
+        frame = self.capture.read()
+        if frame is None:
+            return None
+        self.gesture_detector.detect_gesture(frame)
+        
+        # The new frame takes over from the previous one, which goes back to the pool
+        self.capture.release(self.last_frame)
+        self.last_frame = frame
+        return frame
+    
+    def apply_quality(self):
+        settings = self.quality.settings
+        detector = self.gesture_detector.primary
+        if detector is not None:
+            detector.inference_scale = settings["inference_scale"]
+            detector.inference_interval = settings["inference_interval"]
+            detector.draw_landmarks = settings["landmarks"]
+        self.particles.density = settings["particles"]
+    
+    def camera_surface(self, frame, size, refresh=True):
+        """Downscale + BGR->RGB into persistent buffers and a persistent Surface per size."""
+        buffers = self.preview_buffers.get(size)
+        if buffers is not None and not refresh:
+            return buffers[2]
+        if buffers is None:
+            width, height = size
+            buffers = (np.empty((height, width, 3), dtype=np.uint8),
+                       np.empty((height, width, 3), dtype=np.uint8),
+                       pygame.Surface(size))
+            self.preview_buffers[size] = buffers
+        small, rgb, surface = buffers
+        cv2.resize(frame, size, dst=small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(small, cv2.COLOR_BGR2RGB, dst=rgb)
+        pygame.surfarray.blit_array(surface, rgb.swapaxes(0, 1))
+        return surface
+    
     def reset_game(self):
-        car = Car(400, 500, self.RED)
-        car.friction = self.default_friction
-        car.acceleration = self.default_acceleration
-        car.max_speed = self.default_max_speed
-        car.turn_speed = self.default_turn_speed  # if you're using this
-        self.car = car
+        if self.num_players == 2:
+            starts = [(PLAYFIELD_WIDTH // 2 - 100, PLAYFIELD_HEIGHT - 100, self.RED),
+                      (PLAYFIELD_WIDTH // 2 + 100, PLAYFIELD_HEIGHT - 100, self.BLUE)]
+        else:
+            starts = [(PLAYFIELD_WIDTH // 2, PLAYFIELD_HEIGHT - 100, self.RED)]
+        self.cars = []
+        skins = [path for _, path in self.car_options]
+        for player, (x, y, color) in enumerate(starts):
+            car = Car(x, y, color)
+            # Player 2 drives the next car in the list
+            car.skin = skins[(self.car_choice + player) % len(skins)]
+            car.friction = self.default_friction
+            car.acceleration = self.default_acceleration
+            car.max_speed = self.default_max_speed
+            car.turn_speed = self.default_turn_speed
+            self.cars.append(car)
+        self.car = self.cars[0]
 
         self.obstacles = []
         self.collectibles = []
@@ -583,102 +2546,140 @@ class InclusiveVelocity:
         self.distance = 0
         self.coins = 0
         self.game_speed = 2
-        self.spawn_timer = 0
+        self.course = CourseGenerator(self.course_seed)
+        self.course_tick = 0
+        self.particles.clear()
 
     
     def update_game(self):
-        # Get camera frame
-        ret, frame = self.cap.read()
-        if ret:
-            frame = cv2.flip(frame, 1)  # Mirror image
-            is_fist, is_open_hand, hand_angle = self.gesture_detector.detect_gesture(frame)
-        
-            self.last_frame = frame.copy()
-
-            action, steering_angle = self.gesture_detector.get_action_and_steering()
-            
-           
+        if self.driver is None:
+            # Get camera frame
+            frame = self.capture_frame()
+            if frame is None:
+                return
             self.gesture_detector.sensitivity = self.gesture_sensitivity
+        self.step_world()
+    
+    def player_controls(self, player):
+        if self.driver is not None:
+            return self.driver.drive(self, player)
+        return self.gesture_detector.get_action_and_steering(player)
+    
+    def step_world(self):
+        """Advance cars, course and collisions by one tick."""
+        for player, car in enumerate(self.cars):
+            if car.crashed:
+                continue
+            action, steering_angle = self.player_controls(player)
             
-         
-            if action != self.last_action and self.audio_feedback:
-               
-                pass
-            
-            self.last_action = action
-            self.current_steering = steering_angle
-            self.car.update(action, steering_angle)
-            
-            # Update distance and score
-            self.distance += self.car.speed * 0.1
-            self.score = int(self.distance + self.coins * 10)
-            
-            # Spawn obstacles and collectibles
-            self.spawn_timer += 1
-            if self.spawn_timer > max(30 - self.game_speed, 10):
-                self.spawn_objects()
-                self.spawn_timer = 0
+            if player == 0:
+                if action != self.last_action and self.audio_feedback:
+                    self.audio.play(action)
+                
+                self.last_action = action
+                self.current_steering = steering_angle
+            car.update(action, steering_angle)
+            car.distance += car.speed * 0.1
             
-            # Update game objects
-            for obstacle in self.obstacles[:]:
-                obstacle.y += self.game_speed
-                if obstacle.y > 650:
-                    self.obstacles.remove(obstacle)
-                    
-                # Collision detection
-                if (abs(obstacle.x - self.car.x) < 30 and 
-                    abs(obstacle.y - self.car.y) < 30 and 
-                    self.car.shield_timer <= 0):
+            if car.boost_timer > 0:
+                # Exhaust trail out of the back of the car
+                heading = math.radians(car.angle)
+                self.particles.emit("boost", car.x - math.cos(heading) * car.width / 2,
+                                    car.y - math.sin(heading) * car.width / 2, 2,
+                                    direction=heading + math.pi, spread=0.4)
+            if car.shield_timer > 0 and self.course_tick % 4 == 0:
+                self.particles.emit("shield", car.x, car.y, 1)
+        
+        # Update distance and score (the leading car sets the pace in 2P)
+        self.distance = max(car.distance for car in self.cars)
+        self.coins = sum(car.coins for car in self.cars)
+        self.score = int(self.distance + self.coins * 10)
+        
+        # Spawn obstacles and collectibles from the precomputed course
+        self.course_tick += 1
+        if self.course.next_tick <= self.course_tick:
+            self.spawn_objects()
+        
+        # Update game objects
+        reach = self.collision_masks.reach
+        for obstacle in self.obstacles[:]:
+            obstacle.y += self.game_speed
+            if obstacle.y > PLAYFIELD_HEIGHT + 50:
+                self.obstacles.remove(obstacle)
+                
+            # Collision detection
+            for car in self.cars:
+                if (not car.crashed and
+                    abs(obstacle.x - car.x) < reach and 
+                    abs(obstacle.y - car.y) < reach and 
+                    car.shield_timer <= 0 and
+                    self.collision_masks.hit(car, obstacle)):
                     if obstacle.type == "pothole":
-                        self.car.speed *= 0.5  # Slow down
+                        car.speed *= 0.5  # Slow down
                     else:
-                        self.state = GameState.GAME_OVER
-            
-            for collectible in self.collectibles[:]:
-                collectible.update()
-                collectible.y += self.game_speed
-                if collectible.y > 650:
-                    self.collectibles.remove(collectible)
-                    
-                # Collection detection
-                if (abs(collectible.x - self.car.x) < 25 and 
-                    abs(collectible.y - self.car.y) < 25):
+                        car.crashed = True
+                        self.particles.emit("crash", car.x, car.y, 60)
+                        if self.audio_feedback:
+                            self.audio.play("crash")
+        
+        # Game ends once every player has crashed
+        if all(car.crashed for car in self.cars):
+            self.state = GameState.GAME_OVER
+        
+        for collectible in self.collectibles[:]:
+            collectible.update()
+            collectible.y += self.game_speed
+            if collectible.y > PLAYFIELD_HEIGHT + 50:
+                self.collectibles.remove(collectible)
+                
+            # Collection detection
+            for car in self.cars:
+                if (not car.crashed and
+                    abs(collectible.x - car.x) < 25 and 
+                    abs(collectible.y - car.y) < 25):
                     if collectible.type == "coin":
-                        self.coins += 1
+                        car.coins += 1
+                        self.particles.emit("coin", collectible.x, collectible.y, 16)
                   
                     elif collectible.type == "boost":
-                        self.car.boost_timer = self.default_boost_duration
+                        car.boost_timer = self.default_boost_duration
+                        self.particles.emit("boost", car.x, car.y, 24)
                        
                         boosted_speed = self.default_max_speed * 1.5
                        
                         boosted_speed = min(boosted_speed, 30)
-                        self.car.max_speed = boosted_speed
+                        car.max_speed = boosted_speed
 
                     elif collectible.type == "shield":
-                        self.car.shield_timer = 180
+                        car.shield_timer = 180
+                        self.particles.emit("shield", car.x, car.y, 30)
+                    if self.audio_feedback:
+                        self.audio.play(collectible.type)
                     collectible.active = False
-                    self.collectibles.remove(collectible)
-            
-            # Increase difficulty
-            if int(self.distance) % 100 == 0 and self.distance > 0:
-                self.game_speed = min(self.game_speed + 0.1, 8)
-            
-          
-            if self.car.boost_timer <= 0:
-                self.car.max_speed = self.default_max_speed
+                    if collectible in self.collectibles:
+                        self.collectibles.remove(collectible)
+                    break
+        
+        # Increase difficulty
+        if int(self.distance) % 100 == 0 and self.distance > 0:
+            self.game_speed = min(self.game_speed + 0.1, 8)
+        
+        for car in self.cars:
+            if car.boost_timer <= 0:
+                car.max_speed = self.default_max_speed
+        
+        self.particles.update(self.game_speed)
 
     
     def spawn_objects(self):
-        x = random.randint(50, 750)
         y = -50
         
-        # 70% chance obstacle, 30% chance collectible
-        if random.random() < 0.7:
-            obstacle_type = random.choice(["cone", "pothole", "roadblock"])
-            self.obstacles.append(Obstacle(x, y, obstacle_type))
-        else:
-            collectible_type = random.choice(["coin", "boost", "shield"])
-            self.collectibles.append(Collectible(x, y, collectible_type))
+        while self.course.next_tick <= self.course_tick:
+            x, kind = self.course.pop()
+            if kind < len(OBSTACLE_TYPES):
+                self.obstacles.append(Obstacle(x, y, SPAWN_TYPES[kind]))
+            else:
+                self.collectibles.append(Collectible(x, y, SPAWN_TYPES[kind]))
     
     def draw_menu(self):
         bg_color = self.BLACK if self.high_contrast else (50, 50, 100)
@@ -696,7 +2697,7 @@ class InclusiveVelocity:
         for i, option in enumerate(self.menu_options):
             color = self.GREEN if i == self.selected_option else self.WHITE
             text = self.font.render(option, True, color)
-            text_rect = text.get_rect(center=(400, 250 + i * 60))
+            text_rect = text.get_rect(center=(400, 230 + i * 45))
             self.screen.blit(text, text_rect)
         
         # Instructions
@@ -713,22 +2714,17 @@ class InclusiveVelocity:
         for i, instruction in enumerate(instructions):
             text = self.small_font.render(instruction, True, self.WHITE)
             self.screen.blit(text, (50, 450 + i * 25))
-        ret, frame = self.cap.read()
-      
-        ret, frame = self.cap.read()
-        if ret:
-            frame = cv2.flip(frame, 1)
-          
-            self.gesture_detector.detect_gesture(frame)
-          
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            frame_surface = pygame.surfarray.make_surface(frame_rgb.swapaxes(0,1))
-            small = pygame.transform.scale(frame_surface, (160, 120))
+        # Gestures were already read this tick by handle_menu_gestures
+        if self.last_frame is not None:
+            settings = self.quality.settings
+            width, height = settings["preview_size"]
+            small = self.camera_surface(self.last_frame, (width, height),
+                                        self.frame_count % settings["preview_interval"] == 0)
             # Position: bottom-right
-            x = 800 - 170
-            y = 600 - 130
+            x = 800 - 10 - width
+            y = 600 - 10 - height
             self.screen.blit(small, (x, y))
-            pygame.draw.rect(self.screen, self.WHITE, (x, y, 160, 120), 2)
+            pygame.draw.rect(self.screen, self.WHITE, (x, y, width, height), 2)
             lbl = self.small_font.render("Camera", True, self.WHITE)
             self.screen.blit(lbl, (x, y - 20))
 
@@ -738,17 +2734,13 @@ class InclusiveVelocity:
         self.screen.fill(self.BLACK)
         
        
-        ret, frame = self.cap.read()
-        if ret:
-            frame = cv2.flip(frame, 1)
-            is_fist, is_open_hand, hand_angle = self.gesture_detector.detect_gesture(frame)
+        frame = self.capture_frame()
+        if frame is not None:
+            is_fist = self.gesture_detector.is_fist
+            is_open_hand = self.gesture_detector.is_open_hand
+            hand_angle = self.gesture_detector.hand_angle
             
-           
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            frame_surface = pygame.surfarray.make_surface(frame_rgb.swapaxes(0, 1))
-            
-           
-            scaled_frame = pygame.transform.scale(frame_surface, (400, 300))
+            scaled_frame = self.camera_surface(frame, (400, 300))
             self.screen.blit(scaled_frame, (200, 50))
             
             # Display gesture status
@@ -779,6 +2771,12 @@ class InclusiveVelocity:
             
             sens_help = self.small_font.render("Press +/- to adjust sensitivity", True, self.WHITE)
             self.screen.blit(sens_help, (50, 550))
+            
+            engine_text = self.small_font.render(
+                f"Engine: {self.gesture_detector.engine_name} ({self.gesture_detector.inference_ms:.1f} ms, "
+                f"{self.gesture_detector.skip_ratio:.0%} skipped)",
+                True, self.WHITE)
+            self.screen.blit(engine_text, (50, 575))
         
       
         title = self.font.render("Gesture Calibration & Testing", True, self.WHITE)
@@ -881,44 +2879,76 @@ class InclusiveVelocity:
             
 
     def draw_game(self):
-      
-        bg_color = self.WHITE if self.high_contrast else (100, 150, 100)
-        self.screen.fill(bg_color)
-        
-        # Draw road
-        road_color = self.BLACK if self.high_contrast else (80, 80, 80)
-        pygame.draw.rect(self.screen, road_color, (100, 0, 600, 600))
+        # Letterbox bars hold HUD text too, so clear them every frame
+        if self.letterboxed:
+            self.window.fill(self.BLACK)
+        self.draw_world(self.playfield, self.world_scale)
+        self.present(self.playfield)
+        self.draw_hud()
+    
+    def draw_world(self, surface, scale):
+        # Track images are skipped in high-contrast mode
+        track = None
+        track_path = self.track_options[self.track_choice][1]
+        if track_path is not None and not self.high_contrast:
+            track = self.assets.get(track_path, surface.get_size())
         
-        # Road lines
-        line_color = self.WHITE
-        for y in range(0, 600, 40):
-            pygame.draw.rect(self.screen, line_color, (395, y, 10, 20))
+        if track is not None:
+            surface.blit(track, (0, 0))
+        else:
+            bg_color = self.WHITE if self.high_contrast else (100, 150, 100)
+            surface.fill(bg_color)
+            
+            # Draw road
+            road_color = self.BLACK if self.high_contrast else (80, 80, 80)
+            pygame.draw.rect(surface, road_color, (ROAD_LEFT * scale, 0, ROAD_WIDTH * scale, PLAYFIELD_HEIGHT * scale))
+            
+            # Road lines
+            line_color = self.WHITE
+            center_x = (ROAD_LEFT + ROAD_WIDTH // 2 - 5) * scale
+            for y in range(0, PLAYFIELD_HEIGHT, 40):
+                pygame.draw.rect(surface, line_color, (center_x, y * scale, 10 * scale, 20 * scale))
         
         # Draw game objects
         for obstacle in self.obstacles:
-            obstacle.draw(self.screen)
+            obstacle.draw(surface, scale)
         
+        animate = self.quality.settings["animation"]
         for collectible in self.collectibles:
-            collectible.draw(self.screen)
+            collectible.draw(surface, animate, scale)
         
-        self.car.draw(self.screen)
+        self.particles.draw(surface, scale)
+        
+        for car in self.cars:
+            if car.skin is not None and car.image is None:
+                car.image = self.assets.get(car.skin, (car.width, car.height))
+            car.draw(surface, scale)
+    
+    def draw_hud(self):
+        screen = self.window
+        pos = self.hud_pos
+        hud_scale = self.hud_scale
+        settings = self.quality.settings
         
         # UI
-        score_text = self.font.render(f"Score: {self.score}", True, self.BLACK)
-        self.screen.blit(score_text, (10, 10))
+        score_text = self.hud_font.render(f"Score: {self.score}", True, self.BLACK)
+        screen.blit(score_text, pos(10, 10))
         
-        distance_text = self.font.render(f"Distance: {int(self.distance)}m", True, self.BLACK)
-        self.screen.blit(distance_text, (10, 50))
+        distance_text = self.hud_font.render(f"Distance: {int(self.distance)}m", True, self.BLACK)
+        screen.blit(distance_text, pos(10, 50))
         
-        coins_text = self.font.render(f"Coins: {self.coins}", True, self.BLACK)
-        self.screen.blit(coins_text, (10, 90))
+        coins_text = self.hud_font.render(f"Coins: {self.coins}", True, self.BLACK)
+        screen.blit(coins_text, pos(10, 90))
         
-        speed_text = self.font.render(f"Speed: {int(self.car.speed)}", True, self.BLACK)
-        self.screen.blit(speed_text, (10, 130))
+        speed_text = self.hud_font.render(f"Speed: {int(self.car.speed)}", True, self.BLACK)
+        screen.blit(speed_text, pos(10, 130))
         
         # Gesture feedback
         gesture_status = ""
-        if self.gesture_detector.is_fist:
+        if self.driver is not None:
+            gesture_status = f"AUTOPILOT ({self.last_action})"
+            action_color = self.BLUE
+        elif self.gesture_detector.is_fist:
             gesture_status = "FIST (Braking)"
             action_color = self.RED
         elif self.gesture_detector.is_open_hand:
@@ -928,8 +2958,8 @@ class InclusiveVelocity:
             gesture_status = "NO GESTURE (Coasting)"
             action_color = self.GRAY
             
-        action_text = self.font.render(f"Gesture: {gesture_status}", True, action_color)
-        self.screen.blit(action_text, (10, 170))
+        action_text = self.hud_font.render(f"Gesture: {gesture_status}", True, action_color)
+        screen.blit(action_text, pos(10, 170))
         
         # Steering feedback
         steer_direction = "CENTER"
@@ -938,55 +2968,129 @@ class InclusiveVelocity:
         elif self.current_steering < -5:
             steer_direction = f"LEFT ({self.current_steering:.1f}°)"
             
-        steer_text = self.small_font.render(f"Steering: {steer_direction}", True, self.BLACK)
-        self.screen.blit(steer_text, (10, 210))
+        steer_text = self.hud_small_font.render(f"Steering: {steer_direction}", True, self.BLACK)
+        screen.blit(steer_text, pos(10, 210))
 
         
         # Visual steering indicator
-        pygame.draw.rect(self.screen, self.GRAY, (10, 230, 200, 20), 2)
+        pygame.draw.rect(screen, self.GRAY, (*pos(10, 230), 200 * hud_scale, 20 * hud_scale), max(1, round(2 * hud_scale)))
         steer_pos = 110 + (self.current_steering * 2)  
         steer_pos = max(15, min(205, steer_pos))  
-        pygame.draw.circle(self.screen, self.BLUE, (int(steer_pos), 240), 8)
+        pygame.draw.circle(screen, self.BLUE, pos(steer_pos, 240), max(2, round(8 * hud_scale)))
+        
+        if self.num_players == 2:
+            for player, car in enumerate(self.cars):
+                status = "OUT" if car.crashed else car.last_action.upper()
+                player_text = self.hud_small_font.render(
+                    f"P{player + 1}: {int(car.distance + car.coins * 10)} pts  {status}", True, car.color)
+                screen.blit(player_text, pos(10, 260 + player * 25))
         
        
         if self.car.boost_timer > 0:
-            boost_text = self.small_font.render("BOOST ACTIVE!", True, (255, 255, 0))
-            self.screen.blit(boost_text, (600, 10))
+            boost_text = self.hud_small_font.render("BOOST ACTIVE!", True, (255, 255, 0))
+            screen.blit(boost_text, pos(600, 10))
             
         if self.car.shield_timer > 0:
-            shield_text = self.small_font.render("SHIELD ACTIVE!", True, (0, 255, 255))
-            self.screen.blit(shield_text, (600, 35))
+            shield_text = self.hud_small_font.render("SHIELD ACTIVE!", True, (0, 255, 255))
+            screen.blit(shield_text, pos(600, 35))
       
-        wheel_center = (700, 500)
-        rotated_wheel = pygame.transform.rotate(self.wheel_img, -self.current_steering)  # Negative to match direction
-        rect = rotated_wheel.get_rect(center=wheel_center)
-        self.screen.blit(rotated_wheel, rect)
+        wheel_center = pos(700, 500)
+        size = max(1, round(80 * hud_scale))
+        wheel_img = self.assets.get("steering_wheel.png", (size, size))
+        if wheel_img is None:
+            # Plain rim until the image has loaded
+            pygame.draw.circle(screen, self.GRAY, wheel_center, size // 2, max(2, size // 10))
+        else:
+            if settings["wheel_rotation"]:
+                rotated_wheel = pygame.transform.rotate(wheel_img, -self.current_steering)  # Negative to match direction
+            else:
+                rotated_wheel = wheel_img
+            rect = rotated_wheel.get_rect(center=wheel_center)
+            screen.blit(rotated_wheel, rect)
 
 
         # Label
-        label = self.small_font.render("Steering Wheel", True, self.BLACK)
-        self.screen.blit(label, (wheel_center[0] - 50, wheel_center[1] + 50))
+        label = self.hud_small_font.render("Steering Wheel", True, self.BLACK)
+        screen.blit(label, pos(650, 550))
+        
+        quality_text = self.hud_small_font.render(f"Quality: {settings['name']}", True, self.BLACK)
+        screen.blit(quality_text, pos(10, 570))
        
-        if hasattr(self, 'last_frame'):
-            frame = self.last_frame
-          
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            frame_surface = pygame.surfarray.make_surface(frame_rgb.swapaxes(0, 1))
-           
-            small = pygame.transform.scale(frame_surface, (160, 120))
+        if self.last_frame is not None:
+            width, height = settings["preview_size"]
+            size = (round(width * hud_scale), round(height * hud_scale))
+            small = self.camera_surface(self.last_frame, size,
+                                        self.frame_count % settings["preview_interval"] == 0)
            
-            x = 800 - 170 
-            y = 10        
-            self.screen.blit(small, (x, y))
+            x, y = pos(PLAYFIELD_WIDTH - 10 - width, 10)
+            screen.blit(small, (x, y))
           
             border_color = self.BLACK if self.high_contrast else self.WHITE
-            pygame.draw.rect(self.screen, border_color, (x, y, 160, 120), 2)
+            pygame.draw.rect(screen, border_color, (x, y, *size), max(1, round(2 * hud_scale)))
             # Label
-            lbl = self.small_font.render("Camera", True, border_color)
-            self.screen.blit(lbl, (x, y - 20))
+            lbl = self.hud_small_font.render("Camera", True, border_color)
+            screen.blit(lbl, (x, y - round(20 * hud_scale)))
 
 
     
+    def draw_selection(self):
+        if self.state == GameState.CAR_SELECT:
+            title, options, choice, preview_size = "Choose Your Car", self.car_options, self.car_choice, (240, 120)
+        else:
+            title, options, choice, preview_size = "Choose Your Track", self.track_options, self.track_choice, (320, 240)
+        
+        bg_color = self.BLACK if self.high_contrast else (50, 50, 100)
+        self.screen.fill(bg_color)
+        text = self.font.render(title, True, self.WHITE)
+        self.screen.blit(text, text.get_rect(center=(400, 60)))
+        
+        # Decode the neighbours now so browsing to them is instant
+        for offset in (-1, 1):
+            path = options[(choice + offset) % len(options)][1]
+            if path is not None:
+                self.assets.prefetch(path, preview_size)
+        name, path = options[choice]
+        if path is not None:
+            if self.state == GameState.CAR_SELECT:
+                self.assets.prefetch(path, (40, 20))
+            else:
+                self.assets.prefetch(path, self.playfield.get_size())
+        
+        frame = pygame.Rect(0, 0, *preview_size)
+        frame.center = (400, 260)
+        if path is None:
+            # The built-in car and road
+            if self.state == GameState.CAR_SELECT:
+                car = pygame.Rect(0, 0, 160, 80)
+                car.center = frame.center
+                pygame.draw.rect(self.screen, self.RED, car)
+                pygame.draw.rect(self.screen, (100, 100, 100), car, 6)
+                pygame.draw.rect(self.screen, (200, 200, 200), (car.x + 20, car.y + 20, 40, 40))
+                pygame.draw.rect(self.screen, (200, 200, 200), (car.x + 100, car.y + 20, 40, 40))
+            else:
+                pygame.draw.rect(self.screen, (100, 150, 100), frame)
+                pygame.draw.rect(self.screen, (80, 80, 80), (frame.x + frame.w // 8, frame.y, frame.w * 3 // 4, frame.h))
+                for y in range(frame.y, frame.bottom, 30):
+                    pygame.draw.rect(self.screen, self.WHITE, (frame.centerx - 3, y, 6, 15))
+        else:
+            preview = self.assets.get(path, preview_size)
+            if preview is None:
+                text = self.small_font.render("Loading...", True, self.GRAY)
+                self.screen.blit(text, text.get_rect(center=frame.center))
+            else:
+                self.screen.blit(preview, frame)
+        pygame.draw.rect(self.screen, self.WHITE, frame.inflate(12, 12), 2)
+        
+        text = self.font.render(f"<  {name}  >", True, self.GREEN)
+        self.screen.blit(text, text.get_rect(center=(400, 430)))
+        text = self.small_font.render(f"{choice + 1} / {len(options)}", True, self.WHITE)
+        self.screen.blit(text, text.get_rect(center=(400, 465)))
+        
+        hints = ["Arrows or tilt hand = Browse", "Enter or fist = Select", "Esc or swipe left = Back"]
+        for i, hint in enumerate(hints):
+            text = self.small_font.render(hint, True, self.WHITE)
+            self.screen.blit(text, text.get_rect(center=(400, 510 + i * 25)))
+    
     def draw_game_over(self):
         self.screen.fill(self.BLACK)
         
@@ -996,13 +3100,27 @@ class InclusiveVelocity:
         self.screen.blit(game_over_text, game_over_rect)
         
         # Final stats
-        stats = [
-            f"Final Score: {self.score}",
-            f"Distance: {int(self.distance)}m", 
-            f"Coins Collected: {self.coins}",
-            "",
-            "Press ENTER to return to menu"
-        ]
+        if self.num_players == 2:
+            scores = [int(car.distance + car.coins * 10) for car in self.cars]
+            if scores[0] == scores[1]:
+                winner = "It's a tie!"
+            else:
+                winner = f"Player {scores.index(max(scores)) + 1} wins!"
+            stats = [
+                winner,
+                f"P1 Score: {scores[0]}",
+                f"P2 Score: {scores[1]}",
+                f"Course Seed: {self.course.seed}",
+                "Press ENTER to return to menu"
+            ]
+        else:
+            stats = [
+                f"Final Score: {self.score}",
+                f"Distance: {int(self.distance)}m", 
+                f"Coins Collected: {self.coins}",
+                f"Course Seed: {self.course.seed}",
+                "Press ENTER to return to menu"
+            ]
         
         for i, stat in enumerate(stats):
             color = self.WHITE if stat else self.WHITE
@@ -1015,22 +3133,31 @@ class InclusiveVelocity:
         self.draw_game()
         
        
-        overlay = pygame.Surface((800, 600))
-        overlay.set_alpha(128)
-        overlay.fill(self.BLACK)
-        self.screen.blit(overlay, (0, 0))
+        if self.pause_overlay is None:
+            self.pause_overlay = pygame.Surface(self.viewport.size)
+            self.pause_overlay.set_alpha(128)
+            self.pause_overlay.fill(self.BLACK)
+        self.window.blit(self.pause_overlay, self.viewport.topleft)
         
         # Pause text
-        pause_text = self.font.render("PAUSED", True, self.WHITE)
-        pause_rect = pause_text.get_rect(center=(400, 280))
-        self.screen.blit(pause_text, pause_rect)
+        pause_text = self.hud_font.render("PAUSED", True, self.WHITE)
+        pause_rect = pause_text.get_rect(center=self.hud_pos(400, 280))
+        self.window.blit(pause_text, pause_rect)
         
-        resume_text = self.small_font.render("Press ESC to resume", True, self.WHITE)
-        resume_rect = resume_text.get_rect(center=(400, 320))
-        self.screen.blit(resume_text, resume_rect)
+        resume_text = self.hud_small_font.render("Press ESC to resume", True, self.WHITE)
+        resume_rect = resume_text.get_rect(center=self.hud_pos(400, 320))
+        self.window.blit(resume_text, resume_rect)
     
     def run(self):
+        if self.soak is not None:
+            self.soak.start(self)
         while self.running:
+            frame_start = time.perf_counter()
+            self.capture.wait_ms = 0.0
+            self.frame_count += 1
+            if self.profiler is not None:
+                self.profiler.frame(self.state)
+            self.assets.poll()
             self.handle_events()
             
           
@@ -1038,10 +3165,19 @@ class InclusiveVelocity:
                 self.handle_menu_gestures()
             elif self.state == GameState.SETTINGS:
                 self.handle_settings_gestures()
+            elif self.state in (GameState.CAR_SELECT, GameState.TRACK_SELECT):
+                self.handle_select_gestures()
 
             
             if self.state == GameState.GAME:
                 self.update_game()
+            
+            # The engine loop follows the fastest car still driving and is silent off the track
+            speeds = [car.speed for car in self.cars if not car.crashed]
+            if self.state == GameState.GAME and self.audio_feedback and speeds:
+                self.audio.update_engine(max(speeds) / self.default_max_speed)
+            else:
+                self.audio.stop_engine()
            
             if self.state == GameState.MENU:
 
@@ -1065,19 +3201,586 @@ class InclusiveVelocity:
                 self.draw_game_over()
             elif self.state == GameState.SETTINGS:
                 self.draw_settings()
+            elif self.state in (GameState.CAR_SELECT, GameState.TRACK_SELECT):
+                self.draw_selection()
+            
+            # Menu screens are drawn in logical coordinates; scale them up once
+            if self.state not in (GameState.GAME, GameState.PAUSE):
+                self.present(self.screen)
+            
+            if self.recorder.running:
+                self.recorder.frame(self)
 
             
             pygame.display.flip()
+            # A 30 fps camera blocks ~33 ms per read: that is pacing, not frame work
+            frame_ms = (time.perf_counter() - frame_start) * 1000 - self.capture.wait_ms
+            if self.quality.record(frame_ms):
+                self.apply_quality()
             self.clock.tick(60)
+            
+            if self.soak is not None:
+                self.soak.tick(self)
         
         # Cleanup
-        self.cap.release()
+        if self.profiler is not None:
+            self.profiler.stop()
+        self.recorder.stop()
+        detector = self.gesture_detector.primary
+        if detector is not None and detector.logger is not None:
+            detector.logger.close()
+        if detector is not None and detector.inferred_frames:
+            print(f"Motion gate skipped {detector.skipped_frames} of "
+                  f"{detector.inferred_frames + detector.skipped_frames} frames "
+                  f"({detector.skip_ratio:.0%} of hand-landmark inference saved), "
+                  f"{detector.throttled_frames} more throttled by the quality level")
+        self.capture.close()
+        self.assets.close()
         cv2.destroyAllWindows()
         pygame.quit()
 
+# Tunable car physics: InclusiveVelocity attribute suffix -> (min, max), as clamped in SETTINGS
+SWEEP_PARAMS = {
+    "friction": (0.7, 0.99),
+    "acceleration": (0.1, 1.0),
+    "max_speed": (4, 20),
+    "boost_duration": (60, 300),
+    "turn_speed": (1.0, 10.0),
+}
+
+def parse_sweep_spec(specs):
+    """Turn ["max_speed=6,8,10", ...] into {"max_speed": [6.0, 8.0, 10.0], ...}."""
+    grid = {}
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        name = name.strip().replace("-", "_")
+        if name.startswith("default_"):
+            name = name[len("default_"):]
+        if name not in SWEEP_PARAMS:
+            raise ValueError(f"unknown sweep parameter '{name}' (choose from {', '.join(SWEEP_PARAMS)})")
+        if not values:
+            raise ValueError(f"no values given for sweep parameter '{name}'")
+        grid[name] = [float(v) for v in values.split(",")]
+    return grid
+
+def sweep_configs(grid, samples=0, seed=0):
+    """
+    Grid mode: the cartesian product of the listed values. Sample mode: `samples`
+    random configs, each parameter drawn between the min and max of its listed
+    values, or over its full SETTINGS range when it was not listed.
+    """
+    if not samples:
+        names = list(grid)
+        return [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+    
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for name, (low, high) in SWEEP_PARAMS.items():
+        if name in grid:
+            low, high = min(grid[name]), max(grid[name])
+        columns[name] = rng.uniform(low, high, samples)
+    columns["boost_duration"] = np.rint(columns["boost_duration"])
+    return [{name: float(columns[name][i]) for name in SWEEP_PARAMS} for i in range(samples)]
+
+# One game per worker process, built on its first job and reset between runs
+_sweep_game = None
+
+def init_sweep_worker():
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    pygame.display.quit()
+    pygame.display.init()
+
+def run_sweep_job(job):
+    global _sweep_game
+    index, params, seed, max_ticks, num_players, driver = job
+    if _sweep_game is None:
+        _sweep_game = InclusiveVelocity(frame_source="synthetic", gesture_engine="contour",
+                                        quality="minimal", driver=ScriptedDriver())
+    game = _sweep_game
+    game.driver = make_driver(driver, seed)
+    game.audio_feedback = False
+    for name, value in params.items():
+        setattr(game, "default_" + name, int(value) if name == "boost_duration" else value)
+    game.course_seed = seed
+    game.start_game(num_players)
+    
+    start = time.perf_counter()
+    ticks = 0
+    worst_tick = 0.0
+    peak_objects = 0
+    while game.state == GameState.GAME and ticks < max_ticks:
+        tick_start = time.perf_counter()
+        game.update_game()
+        worst_tick = max(worst_tick, time.perf_counter() - tick_start)
+        peak_objects = max(peak_objects, len(game.obstacles) + len(game.collectibles))
+        ticks += 1
+    elapsed = time.perf_counter() - start
+    
+    return {
+        "config": index,
+        "seed": seed,
+        "ticks": ticks,
+        "seconds": elapsed,
+        "worst_tick_ms": worst_tick * 1000,
+        "peak_objects": peak_objects,
+        "game_speed": game.game_speed,
+        "distance": game.distance,
+        "score": game.score,
+        "crashed": sum(car.crashed for car in game.cars),
+        "cars": len(game.cars),
+        "params": {name: getattr(game, "default_" + name) for name in SWEEP_PARAMS},
+    }
+
+class ParameterSweep:
+    """
+    Runs every (config, seed) pair as a headless game in a process pool, with a
+    driver policy instead of the camera, and aggregates the results per config.
+    """
+    def __init__(self, configs, seeds, max_ticks=3600, num_players=1, workers=None,
+                 report_path="sweep_results.json", driver="greedy"):
+        self.configs = configs or [{}]
+        self.seeds = list(seeds)
+        self.max_ticks = max_ticks
+        self.num_players = num_players
+        self.workers = workers or os.cpu_count()
+        self.report_path = report_path
+        self.driver = driver
+        self.runs = []
+        self.wall_seconds = 0.0
+    
+    def run(self):
+        jobs = [(index, params, seed, self.max_ticks, self.num_players, self.driver)
+                for index, params in enumerate(self.configs) for seed in self.seeds]
+        print(f"Sweeping {len(self.configs)} configs x {len(self.seeds)} seeds "
+              f"= {len(jobs)} games on {self.workers} workers")
+        
+        # Spawned workers start from a clean SDL state instead of a forked copy
+        context = multiprocessing.get_context("spawn")
+        start = time.perf_counter()
+        with ProcessPoolExecutor(self.workers, mp_context=context, initializer=init_sweep_worker) as pool:
+            chunksize = max(1, len(jobs) // (self.workers * 4))
+            for done, run in enumerate(pool.map(run_sweep_job, jobs, chunksize=chunksize), 1):
+                self.runs.append(run)
+                if done % max(1, len(jobs) // 10) == 0:
+                    print(f"  {done}/{len(jobs)} games")
+        self.wall_seconds = time.perf_counter() - start
+        self.write_report()
+    
+    def summarize(self):
+        results = []
+        for index in range(len(self.configs)):
+            runs = [run for run in self.runs if run["config"] == index]
+            ticks = sum(run["ticks"] for run in runs)
+            results.append({
+                "params": runs[0]["params"],
+                "runs": len(runs),
+                "mean_distance": float(np.mean([run["distance"] for run in runs])),
+                "mean_score": float(np.mean([run["score"] for run in runs])),
+                "crash_rate": sum(run["crashed"] for run in runs) / sum(run["cars"] for run in runs),
+                "mean_ticks": ticks / len(runs),
+                "ticks_per_second": ticks / max(sum(run["seconds"] for run in runs), 1e-9),
+                "worst_tick_ms": max(run["worst_tick_ms"] for run in runs),
+                "mean_peak_objects": float(np.mean([run["peak_objects"] for run in runs])),
+            })
+        return results
+    
+    def write_report(self):
+        results = self.summarize()
+        total_ticks = sum(run["ticks"] for run in self.runs)
+        report = {
+            "driver": self.driver,
+            "players": self.num_players,
+            "max_ticks": self.max_ticks,
+            "seeds": self.seeds,
+            "workers": self.workers,
+            "games": len(self.runs),
+            "wall_seconds": self.wall_seconds,
+            "ticks_per_second": total_ticks / max(self.wall_seconds, 1e-9),
+            "results": results,
+            "runs": self.runs,
+        }
+        try:
+            with open(self.report_path, "w") as f:
+                json.dump(report, f, indent=2)
+        except Exception as e:
+            print(f"Error saving sweep results: {e}")
+        
+        print(f"Sweep finished: {len(self.runs)} games, {total_ticks} ticks in {self.wall_seconds:.1f}s "
+              f"({report['ticks_per_second']:.0f} ticks/s across all workers, "
+              f"worst tick {max(run['worst_tick_ms'] for run in self.runs):.2f} ms)")
+        print("Best configs by mean score:")
+        for result in sorted(results, key=lambda r: r["mean_score"], reverse=True)[:5]:
+            params = ", ".join(f"{name}={value:g}" for name, value in result["params"].items())
+            print(f"  score {result['mean_score']:7.1f}  distance {result['mean_distance']:7.1f}  "
+                  f"crash {result['crash_rate']:4.0%}  ticks {result['mean_ticks']:6.0f}  {params}")
+        print(f"Full results written to {self.report_path}")
+
+def parse_hand_label(text):
+    text = text.strip().lower()
+    if text.lstrip("-").isdigit():
+        return int(text)
+    return HAND_STATE_NAMES.index(text) if text in HAND_STATE_NAMES else -1
+
+def extract_image_landmarks(folder):
+    """
+    Run MediaPipe once over a folder of labelled images (<folder>/fist/*.jpg,
+    <folder>/open/..., <folder>/neutral/...) and cache the landmarks next to them.
+    Images are mirrored first, as FrameCapture does for the live camera.
+    """
+    files = []
+    for label, name in enumerate(HAND_STATE_NAMES):
+        class_dir = os.path.join(folder, name)
+        if os.path.isdir(class_dir):
+            files += [(os.path.join(name, f), label) for f in sorted(os.listdir(class_dir))
+                      if f.lower().endswith(AssetManager.EXTENSIONS)]
+    if not files:
+        raise ValueError(f"no images under {folder}/{{{','.join(HAND_STATE_NAMES)}}}/")
+    
+    cache_path = os.path.join(folder, "landmarks.npz")
+    names = np.array([f for f, _ in files])
+    if os.path.exists(cache_path):
+        cache = np.load(cache_path)
+        if np.array_equal(cache["names"], names):
+            return cache["points"], cache["labels"], cache["found"]
+    
+    points = np.zeros((len(files), 21, 3), dtype=np.float32)
+    labels = np.array([label for _, label in files], dtype=np.int8)
+    found = np.zeros(len(files), dtype=bool)
+    start = time.perf_counter()
+    with mp_hands.Hands(static_image_mode=True, max_num_hands=1, min_detection_confidence=0.5) as hands:
+        for i, (name, _) in enumerate(files):
+            image = cv2.imread(os.path.join(folder, name))
+            if image is None:
+                continue
+            image = cv2.cvtColor(cv2.flip(image, 1), cv2.COLOR_BGR2RGB)
+            results = hands.process(image)
+            if results.multi_hand_landmarks:
+                landmarks = results.multi_hand_landmarks[0].landmark
+                points[i] = [(lm.x, lm.y, lm.z) for lm in landmarks]
+                found[i] = True
+    print(f"Extracted landmarks from {len(files)} images in {time.perf_counter() - start:.1f}s "
+          f"({found.sum()} with a hand)")
+    np.savez(cache_path, names=names, points=points, labels=labels, found=found)
+    return points, labels, found
+
+def load_gesture_dataset(path, labels_path=None):
+    """
+    Returns (points (n, 21, 3), labels (n,), sequence ids (n,)). A labels value of
+    -1 means unlabelled: still smoothed through, but left out of the metrics.
+    
+    path is either a folder of labelled images or a LandmarkLogger file. A log
+    needs labels_path: a .npy array with one HAND_* code per record, or a text
+    file of "START_FRAME END_FRAME LABEL" segments (inclusive, by record frame).
+    """
+    if os.path.isdir(path):
+        points, labels, found = extract_image_landmarks(path)
+        if not found.any():
+            raise ValueError(f"no hands detected in the images under {path}")
+        return points[found], labels[found], np.zeros(found.sum(), dtype=np.int8)
+    
+    records = load_landmark_log(path)
+    if labels_path is None:
+        raise ValueError("landmark logs need a labels file")
+    if labels_path.endswith(".npy"):
+        labels = np.load(labels_path).astype(np.int8)
+        if len(labels) != len(records):
+            raise ValueError(f"{len(labels)} labels for {len(records)} records")
+    else:
+        labels = np.full(len(records), -1, dtype=np.int8)
+        frames = records["frame"]
+        with open(labels_path) as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) == 3 and not line.startswith("#"):
+                    start, end = int(fields[0]), int(fields[1])
+                    labels[(frames >= start) & (frames <= end)] = parse_hand_label(fields[2])
+    # Each player's hand has its own smoothing ring, so each is its own sequence
+    return records["points"], labels, records["player"]
+
+def evaluate_gesture_config(detector, points, labels, sequences, max_latency=60):
+    """Classify + smooth a dataset with the detector's current settings and score it."""
+    start = time.perf_counter()
+    states, angles = detector.classify_points(points)
+    smoothed = np.empty_like(labels)
+    smoothed_angles = np.empty(len(labels), dtype=np.float32)
+    for sequence in np.unique(sequences):
+        index = np.flatnonzero(sequences == sequence)
+        smoothed[index], smoothed_angles[index] = detector.smooth_states(states[index], angles[index])
+    elapsed = time.perf_counter() - start
+    
+    labelled = labels >= 0
+    result = {"frames": int(len(labels)), "frames_per_second": len(labels) / max(elapsed, 1e-9)}
+    for kind, predicted in (("raw", states), ("smoothed", smoothed)):
+        classes = {}
+        for code, name in enumerate(HAND_STATE_NAMES):
+            hit = (predicted[labelled] == code) & (labels[labelled] == code)
+            predicted_count = (predicted[labelled] == code).sum()
+            actual_count = (labels[labelled] == code).sum()
+            classes[name] = {
+                "precision": float(hit.sum() / predicted_count) if predicted_count else 0.0,
+                "recall": float(hit.sum() / actual_count) if actual_count else 0.0,
+                "support": int(actual_count),
+            }
+        f1 = [2 * c["precision"] * c["recall"] / (c["precision"] + c["recall"]) if c["precision"] + c["recall"] else 0.0
+              for c in classes.values() if c["support"]]
+        result[kind] = {
+            "accuracy": float((predicted[labelled] == labels[labelled]).mean()) if labelled.any() else 0.0,
+            "macro_f1": float(np.mean(f1)) if f1 else 0.0,
+            "classes": classes,
+        }
+        
+        # Frames from a label change until the prediction follows it
+        latencies = []
+        missed = 0
+        for sequence in np.unique(sequences):
+            index = np.flatnonzero((sequences == sequence) & labelled)
+            seq_labels, seq_predicted = labels[index], predicted[index]
+            changes = np.flatnonzero(seq_labels[1:] != seq_labels[:-1]) + 1
+            ends = np.append(changes[1:], len(index))
+            for change, end in zip(changes, ends):
+                followed = np.flatnonzero(seq_predicted[change:min(end, change + max_latency)] == seq_labels[change])
+                if len(followed):
+                    latencies.append(int(followed[0]))
+                else:
+                    missed += 1
+        result[kind]["transitions"] = len(latencies) + missed
+        result[kind]["mean_latency_frames"] = float(np.mean(latencies)) if latencies else None
+        result[kind]["missed_transitions"] = missed
+    
+    raw_latency = result["raw"]["mean_latency_frames"]
+    smoothed_latency = result["smoothed"]["mean_latency_frames"]
+    result["added_latency_frames"] = (smoothed_latency - raw_latency
+                                      if raw_latency is not None and smoothed_latency is not None else None)
+    # Frame-to-frame steering change of the smoothed angle, in degrees
+    result["steering_jitter"] = float(np.abs(np.diff(smoothed_angles)).mean()) if len(labels) > 1 else 0.0
+    return result
+
+# One detector and dataset per evaluation worker process
+_eval_state = None
+
+def init_eval_worker(dataset_path, labels_path):
+    global _eval_state
+    _eval_state = (GestureDetector(), load_gesture_dataset(dataset_path, labels_path))
+
+def run_eval_job(config):
+    detector, (points, labels, sequences) = _eval_state
+    detector.fist_threshold = config["fist_threshold"]
+    detector.open_threshold = config["open_threshold"]
+    detector.smoothing_window = config["smoothing_window"]
+    return dict(config, **evaluate_gesture_config(detector, points, labels, sequences))
+
+class GestureEvaluation:
+    """
+    Offline tuning of the hand-state thresholds and smoothing window: every
+    combination is scored on a labelled dataset in a process pool.
+    """
+    def __init__(self, dataset_path, labels_path=None, fist_thresholds=(0.15,), open_thresholds=(0.25,),
+                 windows=(8,), workers=None, report_path="gesture_eval.json"):
+        self.dataset_path = dataset_path
+        self.labels_path = labels_path
+        self.configs = [{"fist_threshold": f, "open_threshold": o, "smoothing_window": int(w)}
+                        for f, o, w in itertools.product(fist_thresholds, open_thresholds, windows) if f < o]
+        self.workers = workers or os.cpu_count()
+        self.report_path = report_path
+        self.results = []
+    
+    def run(self):
+        # Validates the dataset and builds the image landmark cache before the workers start
+        points, labels, sequences = load_gesture_dataset(self.dataset_path, self.labels_path)
+        print(f"Evaluating {len(self.configs)} configs on {len(labels)} frames "
+              f"({(labels >= 0).sum()} labelled) with {self.workers} workers")
+        
+        context = multiprocessing.get_context("spawn")
+        start = time.perf_counter()
+        with ProcessPoolExecutor(self.workers, mp_context=context, initializer=init_eval_worker,
+                                 initargs=(self.dataset_path, self.labels_path)) as pool:
+            self.results = list(pool.map(run_eval_job, self.configs))
+        self.wall_seconds = time.perf_counter() - start
+        self.write_report()
+    
+    def write_report(self):
+        ranked = sorted(self.results, key=lambda r: r["smoothed"]["macro_f1"], reverse=True)
+        report = {
+            "dataset": self.dataset_path,
+            "labels": self.labels_path,
+            "wall_seconds": self.wall_seconds,
+            "results": ranked,
+        }
+        try:
+            with open(self.report_path, "w") as f:
+                json.dump(report, f, indent=2)
+        except Exception as e:
+            print(f"Error saving gesture evaluation: {e}")
+        
+        print(f"Evaluation finished in {self.wall_seconds:.1f}s. Best configs by smoothed macro F1:")
+        for result in ranked[:5]:
+            smoothed = result["smoothed"]
+            classes = "  ".join(f"{name} P{c['precision']:.2f}/R{c['recall']:.2f}"
+                                for name, c in smoothed["classes"].items())
+            latency = result["added_latency_frames"]
+            print(f"  fist<{result['fist_threshold']:g} open>{result['open_threshold']:g} "
+                  f"window {result['smoothing_window']}: F1 {smoothed['macro_f1']:.3f} "
+                  f"(raw {result['raw']['macro_f1']:.3f})  {classes}  "
+                  f"+{latency if latency is not None else float('nan'):.1f} frames latency  "
+                  f"{result['frames_per_second']:.0f} frames/s")
+        print(f"Full results written to {self.report_path}")
+
+def parse_window_size(value):
+    """argparse type for --window: "WxH" -> (width, height)."""
+    try:
+        width, height = (int(v) for v in value.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT (e.g. 1280x720), got {value!r}")
+    if width <= 0 or height <= 0:
+        raise argparse.ArgumentTypeError(f"window size must be positive, got {value!r}")
+    return width, height
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Inclusive Velocity - Gesture Racing")
+    parser.add_argument("--frames", metavar="SOURCE", default=None,
+                        help="camera index, video file, or 'synthetic' (default: camera 0)")
+    parser.add_argument("--gesture-engine", choices=["auto", "mediapipe", "contour"], default="auto",
+                        help="hand tracker: MediaPipe, OpenCV contours, or switch automatically on load")
+    parser.add_argument("--contour-background", action="store_true",
+                        help="gate the contour tracker's skin mask with a learned background model "
+                             "(steadier against skin-coloured backgrounds, needs a fixed camera)")
+    parser.add_argument("--no-motion-gate", action="store_true",
+                        help="run hand-landmark inference on every frame, even when nothing moves")
+    parser.add_argument("--profile", metavar="STATE[:FRAMES]", default=os.environ.get("RIDER_PROFILE"),
+                        help="profile a game state (MENU, GAME, CALIBRATION, ... or 'all') for FRAMES frames; "
+                             "also read from $RIDER_PROFILE, and F9 toggles profiling in game")
+    parser.add_argument("--profile-dir", default="profiles", metavar="DIR",
+                        help="where profile files are written")
+    parser.add_argument("--quality", choices=["auto"] + [level["name"].lower() for level in QUALITY_LEVELS],
+                        default="auto", help="fixed quality level, or 'auto' to adapt to the frame budget")
+    parser.add_argument("--window", metavar="WxH", type=parse_window_size,
+                        default=f"{PLAYFIELD_WIDTH}x{PLAYFIELD_HEIGHT}",
+                        help="window size; the 4:3 playfield is letterboxed to fit")
+    parser.add_argument("--fullscreen", action="store_true",
+                        help="run fullscreen at the display's native resolution")
+    parser.add_argument("--render-scale", type=float, default=1.0, metavar="SCALE",
+                        help="internal resolution of the race view relative to the window (e.g. 0.5)")
+    parser.add_argument("--smooth-scale", action="store_true",
+                        help="filter the upscale to the window (smoother, but slower than a lower render scale saves)")
+    parser.add_argument("--headless", action="store_true",
+                        help="render to an offscreen display (no window)")
+    parser.add_argument("--record", action="store_true",
+                        help="record the screen and camera feed from startup; F10 toggles recording in game")
+    parser.add_argument("--record-dir", default="recordings", metavar="DIR",
+                        help="where recordings are written")
+    parser.add_argument("--record-fps", type=int, default=30, metavar="FPS",
+                        help="recording frame rate")
+    parser.add_argument("--record-codec", default="mp4v", metavar="FOURCC",
+                        help="video codec passed to cv2.VideoWriter")
+    parser.add_argument("--log-landmarks", metavar="PATH",
+                        help="append every MediaPipe hand detection to a binary landmark log "
+                             "(open with load_landmark_log)")
+    parser.add_argument("--eval", metavar="DATASET",
+                        help="score the gesture classifier offline on a labelled image folder or landmark log")
+    parser.add_argument("--eval-labels", metavar="PATH",
+                        help="labels for a landmark log: .npy codes per record or 'START END LABEL' segments")
+    parser.add_argument("--eval-fist", default="0.15", metavar="T1,T2",
+                        help="fist thresholds to try")
+    parser.add_argument("--eval-open", default="0.25", metavar="T1,T2",
+                        help="open-hand thresholds to try")
+    parser.add_argument("--eval-window", default="8", metavar="N1,N2",
+                        help="smoothing window sizes to try")
+    parser.add_argument("--eval-workers", type=int, default=None, metavar="N",
+                        help="worker processes (default: one per core)")
+    parser.add_argument("--eval-report", default="gesture_eval.json", metavar="PATH",
+                        help="where to write the evaluation results")
+    parser.add_argument("--particle-bench", action="store_true",
+                        help="time the particle system with thousands of live particles and exit")
+    parser.add_argument("--soak", type=float, metavar="SECONDS",
+                        help="run a soak test for this long and write a memory report")
+    parser.add_argument("--soak-interval", type=float, default=30.0, metavar="SECONDS",
+                        help="seconds between memory samples during a soak test")
+    parser.add_argument("--soak-report", default="soak_report.json", metavar="PATH",
+                        help="where to write the soak report")
+    parser.add_argument("--sweep", nargs="*", metavar="PARAM=V1,V2",
+                        help="run headless games over a grid of car settings instead of playing "
+                             f"({', '.join(SWEEP_PARAMS)})")
+    parser.add_argument("--sweep-samples", type=int, default=0, metavar="N",
+                        help="draw N random configs within the listed values (or the full ranges) instead of a grid")
+    parser.add_argument("--sweep-seeds", type=int, default=8, metavar="N",
+                        help="course seeds 0..N-1 played for every config")
+    parser.add_argument("--sweep-ticks", type=int, default=3600, metavar="TICKS",
+                        help="tick limit per game")
+    parser.add_argument("--sweep-players", type=int, choices=[1, 2], default=1,
+                        help="cars per game")
+    parser.add_argument("--sweep-workers", type=int, default=None, metavar="N",
+                        help="worker processes (default: one per core)")
+    parser.add_argument("--sweep-report", default="sweep_results.json", metavar="PATH",
+                        help="where to write the sweep results")
+    parser.add_argument("--sweep-driver", choices=list(DRIVERS), default="greedy",
+                        help="driver policy used for sweep games")
+    parser.add_argument("--autopilot", choices=list(DRIVERS), default=None,
+                        help="let a driver policy steer instead of the camera")
+    return parser.parse_args()
+
 if __name__ == "__main__":
+    args = parse_args()
+    if args.sweep is not None:
+        try:
+            configs = sweep_configs(parse_sweep_spec(args.sweep), args.sweep_samples)
+        except ValueError as e:
+            sys.exit(f"--sweep: {e}")
+        # Workers inherit these before importing pygame, so none of them opens a window
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+        ParameterSweep(configs, range(args.sweep_seeds), args.sweep_ticks, args.sweep_players,
+                       args.sweep_workers, args.sweep_report, args.sweep_driver).run()
+        sys.exit()
+    if args.particle_bench:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        pygame.display.quit()
+        pygame.display.init()
+        pygame.display.set_mode((PLAYFIELD_WIDTH, PLAYFIELD_HEIGHT))
+        benchmark_particles()
+        sys.exit()
+    if args.eval:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+        try:
+            GestureEvaluation(args.eval, args.eval_labels,
+                              [float(v) for v in args.eval_fist.split(",")],
+                              [float(v) for v in args.eval_open.split(",")],
+                              [int(v) for v in args.eval_window.split(",")],
+                              args.eval_workers, args.eval_report).run()
+        except ValueError as e:
+            sys.exit(f"--eval: {e}")
+        sys.exit()
+    if args.headless:
+        # pygame is initialised at import time, so restart video on the dummy driver
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        pygame.display.quit()
+        pygame.display.init()
+    profiler = None
+    if args.profile:
+        try:
+            profiler = SessionProfiler.from_spec(args.profile, args.profile_dir)
+        except ValueError as e:
+            sys.exit(f"--profile / RIDER_PROFILE: {e}")
+    recorder = SessionRecorder(args.record_dir, args.record_fps, codec=args.record_codec)
+    if args.record:
+        recorder.start()
+    soak = None
+    if args.soak:
+        soak = SoakMonitor(args.soak, args.soak_interval, args.soak_report)
     try:
-        game = InclusiveVelocity()
+        game = InclusiveVelocity(frame_source=args.frames, soak=soak, gesture_engine=args.gesture_engine,
+                                 profiler=profiler, quality=args.quality,
+                                 window_size=args.window,
+                                 fullscreen=args.fullscreen,
+                                 render_scale=max(0.1, min(2.0, args.render_scale)), smooth_scale=args.smooth_scale,
+                                 driver=make_driver(args.autopilot) if args.autopilot else None,
+                                 recorder=recorder, profile_dir=args.profile_dir,
+                                 contour_background=args.contour_background)
+        if args.no_motion_gate and game.gesture_detector.primary is not None:
+            game.gesture_detector.primary.motion_gate = False
+        if args.log_landmarks and game.gesture_detector.primary is not None:
+            game.gesture_detector.primary.logger = LandmarkLogger(args.log_landmarks)
         game.run()
     except Exception as e:
         print(f"Error running game: {e}")